@@ -1,15 +1,22 @@
 """ber.py
 """
 # Standard library imports
+from __future__ import annotations
+from collections.abc import Mapping
 from enum import IntEnum
+from functools import lru_cache
 from math import log2
+from typing import Iterable, Iterator, NamedTuple
 
 # Third party imports
 
 
 # Local application imports
-from common.binary import HexString, ByteString
-from common.parserc import null, byte, nibble, joint, one_of, exclude, generate, many, count
+from common.binary import ByteBuffer, ByteString, ByteStringView, HexString
+
+
+# States of TlvStreamParser: receiving the tag, length or value field
+_TAG, _LENGTH, _VALUE = range(3)
 
 
 # Enum definitions
@@ -32,10 +39,10 @@ class TagConstruction(IntEnum):
 class Tag(ByteString):
     def __init__(self, tag: str):
         super().__init__(tag)
-        tag, remainder = T_fieldP.parse_partial(self.data)
-        if remainder != '':
+        end = read_tag(self.bytes)
+        if end != len(self):
             raise ValueError(
-                F"Unknown bytes '{remainder}' after tag '{tag}'")
+                F"Unknown bytes '{self[end:]}' after tag '{self[:end]}'")
 
         if len(self) == 1:
             if (tag_number := int(self) & 0x1F) == 0x1F:
@@ -113,10 +120,10 @@ def create_tag(tag_class: TagClass, tag_construction: TagConstruction, tag_numbe
 class Length(ByteString):
     def __init__(self, length: str):
         super().__init__(length)
-        length, remainder = L_fieldP.parse_partial(self.data)
-        if remainder != '':
+        _, end = read_length(self.bytes)
+        if end != len(self):
             raise ValueError(
-                F"Unknown bytes '{remainder}' after length '{length}'")
+                F"Unknown bytes '{self[end:]}' after length '{self[:end]}'")
 
         length_bytes = self.bytes
 
@@ -137,18 +144,20 @@ class Length(ByteString):
         return self.__length
 
 
-def create_length(value: ByteString) -> Length:
-    match len(value):
+def create_length(value: ByteString | HexString) -> Length:
+    # number of bytes: a HexString holds 2 digits per byte
+    value_length = len(value) if isinstance(value, ByteString) else len(value.bytestring)
+    match value_length:
         case l if l < 128:
             return Length(F'{l:02X}')
 
         case l if log2(l) < 1017:
-            nr_bits = len(value).bit_length()
+            nr_bits = value_length.bit_length()
             if nr_bits % 8 == 0:
                 nr_bytes = nr_bits//8
             else:
                 nr_bytes = nr_bits//8 + 1
-            return Length(F"{128+nr_bytes:02X}" + format(len(value), F"0{nr_bytes*2}X"))
+            return Length(F"{128+nr_bytes:02X}" + format(value_length, F"0{nr_bytes*2}X"))
 
         case _:
             raise ValueError(F"Cannot encode length > 2^1016")
@@ -158,15 +167,19 @@ def create_length(value: ByteString) -> Length:
 class TagLengthValue(ByteString):
     def __init__(self, tlv: str):
         super().__init__(tlv)
-        partial_parse = TagLengthValueP.parse_partial(self.data)
-        if partial_parse[1] != '':
+        data = self.bytes
+
+        # leading and trailing '00' bytes are ignored
+        start = len(data) - len(data.lstrip(b'\x00'))
+        tag, length, value_offset = read_tlv(data, start)
+        end = value_offset + length
+        if data[end:].strip(b'\x00'):
             raise ValueError(
-                F"Unknown bytes '{partial_parse[1]}' after TLV '{tlv}'")
+                F"Unknown bytes '{self[end:]}' after TLV '{self[start:end]}'")
 
-        tag, length, value = partial_parse[0]
         self.__tag = Tag(tag)
-        self.__length = Length(length)
-        self.__value = ByteString(value)
+        self.__length = Length(data[start+len(tag):value_offset])
+        self.__value = ByteStringView(self, value_offset, length)
 
     @property
     def tag(self) -> Tag:
@@ -181,6 +194,302 @@ class TagLengthValue(ByteString):
         return self.__value
 
 
+# TlvNode: lazily decoded BER-TLV tree
+class TlvNode:
+    """TlvNode: TLV of a BER-TLV tree, read in place from the parent data
+
+    Only the tag, length and offsets are read when the node is created. The children
+    of a constructed TLV are decoded the first time they are iterated or indexed,
+    then kept: subtrees that are never accessed are never decoded.
+    """
+
+    __slots__ = ('data', 'tag', 'length', 'offset', 'value_offset', '_children')
+
+    def __init__(self, data: bytes, tag: bytes, length: int, offset: int, value_offset: int):
+        self.data = data
+        self.tag = tag
+        self.length = length
+        self.offset = offset
+        self.value_offset = value_offset
+        self._children = None
+
+    @property
+    def end(self) -> int:
+        return self.value_offset + self.length
+
+    @property
+    def constructed(self) -> bool:
+        return (self.tag[0] & TagConstruction.Constructed) != 0
+
+    @property
+    def value(self) -> ByteString:
+        return ByteStringView(self.data, self.value_offset, self.length)
+
+    @property
+    def children(self) -> list[TlvNode]:
+        if self._children is None:
+            if not self.constructed:
+                raise ValueError(
+                    F"TlvNode()| primitive TLV '{self.tag.hex().upper()}' has no children")
+            self._children = parse_tree(self.data, self.value_offset, self.end)
+        return self._children
+
+    def __iter__(self) -> Iterator[TlvNode]:
+        return iter(self.children)
+
+    def __getitem__(self, key: int | str | bytes | ByteString) -> TlvNode:
+        """node[i]: i-th child, node['9F38']: first child with tag '9F38'
+        """
+        if isinstance(key, int):
+            return self.children[key]
+
+        tag = _tag_bytes(key)
+        for child in self.children:
+            if child.tag == tag:
+                return child
+        raise KeyError(key)
+
+    def get(self, key: str | bytes | ByteString, default: TlvNode | None = None) -> TlvNode | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return F"TlvNode('{self.tag.hex().upper()}', {self.length})"
+
+
+def parse_tree(data: bytes | ByteString, offset: int = 0, end: int | None = None) -> list[TlvNode]:
+    """parse_tree(): top-level TLVs of 'data' as TlvNode objects, their children are decoded on access
+    """
+    if isinstance(data, ByteString):
+        data = data.bytes
+
+    return [TlvNode(data, tag, length, tlv_offset, value_offset)
+            for tlv_offset, tag, length, value_offset in _scan(data, offset, end)]
+
+
+# TlvIndex: tag index of BER-TLV data
+class TlvOccurrence(NamedTuple):
+    tag: str
+    path: tuple[str, ...]  # tags of the enclosing TLVs, outermost first
+    data: bytes
+    offset: int
+    value_offset: int
+    length: int
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+    @property
+    def value(self) -> ByteString:
+        return ByteStringView(self.data, self.value_offset, self.length)
+
+
+class TlvIndex(Mapping):
+    """TlvIndex: occurrences of each tag in BER-TLV data, at any depth
+
+    Built in one pass over the data, constructed TLVs included. As a mapping,
+    index['9F38'] is the value of the first occurrence of '9F38'; a path such as
+    index['6F/A5/BF0C/61/4F'] selects occurrences by their enclosing tags.
+    """
+
+    def __init__(self, data: bytes | ByteString | None = None):
+        self._occurrences: dict[str, list[TlvOccurrence]] = {}
+        if data is not None:
+            self.add(data)
+
+    def add(self, data: bytes | ByteString) -> TlvIndex:
+        """add(): indexes the TLVs of 'data', e.g. one more record of a card dump
+        """
+        if isinstance(data, ByteString):
+            data = data.bytes
+
+        occurrences = self._occurrences
+        # depth-first, so that the occurrences of each tag are in data order
+        stack = [(_scan(data, 0, len(data)), ())]
+        while stack:
+            scanner, path = stack[-1]
+            for offset, tag, length, value_offset in scanner:
+                tag_string = tag.hex().upper()
+                occurrences.setdefault(tag_string, []).append(
+                    TlvOccurrence(tag_string, path, data, offset, value_offset, length))
+                if tag[0] & TagConstruction.Constructed:
+                    stack.append((_scan(data, value_offset, value_offset + length), path + (tag_string,)))
+                    break
+            else:
+                stack.pop()
+
+        return self
+
+    def update(self, other: TlvIndex) -> TlvIndex:
+        """update(): adds the occurrences of 'other', without parsing again
+        """
+        for tag, occurrences in other._occurrences.items():
+            self._occurrences.setdefault(tag, []).extend(occurrences)
+        return self
+
+    @classmethod
+    def merge(cls, *indexes: TlvIndex) -> TlvIndex:
+        """merge(): new index with the occurrences of all 'indexes', in order
+        """
+        merged = cls()
+        for index in indexes:
+            merged.update(index)
+        return merged
+
+    def occurrences(self, tag: str) -> list[TlvOccurrence]:
+        """occurrences(): all occurrences of 'tag', or of the last tag of a path such as '70/57'
+        """
+        components = tuple(component.upper() for component in str(tag).strip('/').split('/'))
+        occurrences = self._occurrences.get(components[-1], [])
+        if len(components) == 1:
+            return list(occurrences)
+
+        # the path matches the last enclosing tags
+        enclosing = components[:-1]
+        return [occurrence for occurrence in occurrences if occurrence.path[-len(enclosing):] == enclosing]
+
+    def find(self, tag: str) -> TlvOccurrence | None:
+        """find(): first occurrence of 'tag' (or path), None if there is none
+        """
+        occurrences = self.occurrences(tag)
+        return occurrences[0] if occurrences else None
+
+    def __getitem__(self, tag: str) -> ByteString:
+        occurrence = self.find(tag)
+        if occurrence is None:
+            raise KeyError(tag)
+        return occurrence.value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._occurrences)
+
+    def __len__(self) -> int:
+        return len(self._occurrences)
+
+    def __repr__(self):
+        return F"TlvIndex({list(self._occurrences)})"
+
+
+# TlvStreamParser: incremental BER-TLV parser
+class TlvStreamParser:
+    """TlvStreamParser: top-level TLVs of data received in chunks (GET RESPONSE chains, CCID blocks...)
+
+    feed() returns the TLVs completed by each chunk, as TlvNode objects, as soon as
+    their last byte is received. A partial tag, length or value is kept between
+    calls, each byte is read only once.
+    """
+
+    def __init__(self):
+        self._tlv = bytearray()
+        self._state = _TAG
+        self._tag_size = 0
+        self._length_bytes = 0
+        self._value_offset = 0
+        self._remaining = 0
+
+    @property
+    def pending(self) -> int:
+        """pending: number of bytes received of the TLV in progress
+        """
+        return len(self._tlv)
+
+    def feed(self, data: bytes | ByteString) -> list[TlvNode]:
+        """feed(): adds the next chunk of data, returns the TLVs it completes
+        """
+        data = data.memoryview if isinstance(data, ByteString) else memoryview(data)
+        tlv, nodes, position = self._tlv, [], 0
+        while position < len(data):
+            if self._state == _VALUE:
+                size = min(self._remaining, len(data) - position)
+                tlv += data[position:position+size]
+                position += size
+                self._remaining -= size
+
+            else:
+                byte = data[position]
+                position += 1
+                if self._state == _TAG:
+                    if not tlv and byte == 0x00:
+                        # '00' bytes before and after TLVs are skipped
+                        continue
+                    tlv.append(byte)
+                    if (len(tlv) == 1 and (byte & 0x1F) != 0x1F) or (len(tlv) > 1 and (byte & 0x80) == 0x00):
+                        self._tag_size, self._state = len(tlv), _LENGTH
+
+                else:
+                    tlv.append(byte)
+                    if len(tlv) == self._tag_size + 1:
+                        self._length_bytes = 0 if byte < 0x80 else byte & 0x7F
+                    if len(tlv) == self._tag_size + 1 + self._length_bytes:
+                        length, self._value_offset = read_length(tlv, self._tag_size)
+                        self._remaining, self._state = length, _VALUE
+
+            if self._state == _VALUE and self._remaining == 0:
+                nodes.append(self._emit())
+
+        return nodes
+
+    def close(self) -> None:
+        """close(): end of the stream, raises ValueError if a TLV is incomplete
+        """
+        if self._tlv:
+            raise ValueError(
+                F"TlvStreamParser()| incomplete TLV at the end of the stream: {self._tlv.hex().upper()}")
+
+    def _emit(self) -> TlvNode:
+        data = bytes(self._tlv)
+        self._tlv.clear()
+        self._state = _TAG
+        return TlvNode(data, data[:self._tag_size], len(data) - self._value_offset, 0, self._value_offset)
+
+
+def parse_stream(chunks: Iterable[bytes | ByteString]) -> Iterator[TlvNode]:
+    """parse_stream(): top-level TLVs of the data received as 'chunks', each one as soon as it is complete
+    """
+    parser = TlvStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+# TLV encoder
+TlvTree = Iterable[tuple[str | bytes | ByteString, 'bytes | ByteString | str | list']]
+
+
+def encode_tlv(tlvs: TlvTree) -> ByteString:
+    """encode_tlv(): BER-TLV encoding of a tree of (tag, value) pairs
+
+    A value is either bytes (bytes, ByteString or hexadecimal string) or the list of
+    the (tag, value) pairs of a constructed TLV. All lengths are computed first, the
+    encoding is then written once into a buffer of the final size.
+    """
+    plan: list[tuple[bytes, int, bytes | memoryview | None]] = []
+    buffer = ByteBuffer(_plan(tlvs, plan))
+
+    offset = 0
+    for tag, length, value in plan:
+        buffer[offset:offset+len(tag)] = tag
+        offset += len(tag)
+
+        if length < 0x80:
+            buffer[offset] = length
+            offset += 1
+        else:
+            nr_bytes = _length_size(length) - 1
+            buffer[offset] = 0x80 + nr_bytes
+            buffer[offset+1:offset+1+nr_bytes] = length.to_bytes(nr_bytes, 'big')
+            offset += 1 + nr_bytes
+
+        if value is not None:
+            buffer[offset:offset+length] = value
+            offset += length
+
+    return buffer.freeze()
+
+
 # class TagLength():
 #     def __init__(self, tl: str):
 #         pass
@@ -192,68 +501,150 @@ class TagLengthValue(ByteString):
 
 
 #
-# Parser combinators
+# Parser functions
 #
-# Tag field parsers
-__T_multi_byte_start = joint(one_of('13579bBdDfF'),
-                             one_of('fF'))
-__T_multi_byte_inner = joint(one_of('89aAbBcCdDeEfF'),
-                             nibble)
-__T_multi_byte_last = joint(one_of('01234567'),
-                            nibble)
-__T_single_byte = exclude(byte,
-                          __T_multi_byte_start)
-
-
-@generate
-def __T_multi_byte():
-    """Parses a multi-byte Tag Field.
+# The functions work on 'bytes' (or any bytes-like object) with integer offsets,
+# 'end' (by default: the end of 'data') bounds the bytes they may read.
+def read_tag(data: bytes, offset: int = 0, end: int | None = None) -> int:
+    """read_tag(): end offset of the tag field starting at 'offset'
     """
-    start_tag = yield __T_multi_byte_start
-    inner_tags = yield many(__T_multi_byte_inner)
-    inner_tags = ''.join(inner_tags)
-    last_tag = yield __T_multi_byte_last
+    end = len(data) if end is None else end
+    if offset >= end:
+        raise ValueError(
+            F"read_tag()| expecting a tag at offset {offset}, no bytes left")
 
-    return start_tag + inner_tags + last_tag
+    first_byte = data[offset]
+    offset += 1
+    if (first_byte & 0x1F) != 0x1F:
+        return offset
 
+    # subsequent bytes: b8 = 1 on all but the last one
+    while offset < end:
+        offset += 1
+        if (data[offset-1] & 0x80) == 0x00:
+            return offset
 
-T_fieldP = __T_single_byte | __T_multi_byte
+    raise ValueError(
+        F"read_tag()| multi-byte tag truncated at offset {offset}")
 
 
-# Length Field parser
-__L_single_byte = joint(one_of('01234567'), nibble)
-__L_multi_byte_start = joint(
-    one_of('89aAbBcCdDeEfF'), nibble)
+def read_length(data: bytes, offset: int = 0, end: int | None = None) -> tuple[int, int]:
+    """read_length(): (length, end offset) of the length field starting at 'offset'
+    """
+    end = len(data) if end is None else end
+    if offset >= end:
+        raise ValueError(
+            F"read_length()| expecting a length at offset {offset}, no bytes left")
 
+    first_byte = data[offset]
+    offset += 1
+    if first_byte < 0x80:
+        return first_byte, offset
 
-@generate
-def __L_multi_byte():
-    start_length = yield __L_multi_byte_start
-    nr_bytes = int(start_length, 16) - 0x80
-    subsequent_length = yield count(byte, nr_bytes)
-    subsequent_length = ''.join(subsequent_length)
+    nr_bytes = first_byte & 0x7F
+    if offset + nr_bytes > end:
+        raise ValueError(
+            F"read_length()| expecting {nr_bytes} length bytes at offset {offset}, received {end - offset}")
 
-    return start_length + subsequent_length
+    return int.from_bytes(data[offset:offset+nr_bytes], 'big'), offset + nr_bytes
 
 
-L_fieldP = __L_single_byte | __L_multi_byte
+def read_tlv(data: bytes, offset: int = 0, end: int | None = None) -> tuple[bytes, int, int]:
+    """read_tlv(): (tag, length, value offset) of the TLV starting at 'offset'
+    """
+    end = len(data) if end is None else end
+    tag_end = read_tag(data, offset, end)
+    length, value_offset = read_length(data, tag_end, end)
+    if value_offset + length > end:
+        raise ValueError(
+            F"read_tlv()| expecting {length} value bytes at offset {value_offset}, received {end - value_offset}")
 
+    return bytes(data[offset:tag_end]), length, value_offset
 
-# TLV parser
-@generate
-def TagLengthValueP():
-    # ignore leading 00
-    _ = yield many(null)
 
-    tag = yield T_fieldP
-    length = yield L_fieldP
-    value = yield count(byte, Length(length).value)
-    value = ''.join(value)
+def iter_tlv(data: bytes, offset: int = 0, end: int | None = None) -> Iterator[tuple[bytes, int, int]]:
+    """iter_tlv(): (tag, length, value offset) of the consecutive TLVs, '00' bytes before and after TLVs are skipped
+    """
+    for _, tag, length, value_offset in _scan(data, offset, end):
+        yield tag, length, value_offset
 
-    # ignore trailing 00
-    _ = yield many(null)
 
-    return tag, length, value
+#
+# helper functions
+#
+def _scan(data: bytes, offset: int, end: int | None) -> Iterator[tuple[int, bytes, int, int]]:
+    # (TLV offset, tag, length, value offset) of the consecutive TLVs
+    end = len(data) if end is None else end
+    while offset < end:
+        if data[offset] == 0x00:
+            offset += 1
+            continue
+
+        tag, length, value_offset = read_tlv(data, offset, end)
+        yield offset, tag, length, value_offset
+        offset = value_offset + length
+
+
+def _plan(tlvs: TlvTree, plan: list[tuple[bytes, int, bytes | memoryview | None]]) -> int:
+    # appends (tag, length, value) in encoding order, None as the value of constructed TLVs;
+    # returns the encoded size of 'tlvs'
+    size = 0
+    for tag, value in tlvs:
+        tag = _encoded_tag(tag)
+        match value:
+            case list():
+                index = len(plan)
+                plan.append(None)
+                length = _plan(value, plan)
+                plan[index] = (tag, length, None)
+            case ByteString():
+                value = value.memoryview
+                length = len(value)
+                plan.append((tag, length, value))
+            case str() | HexString():
+                value = ByteString(str(value)).bytes
+                length = len(value)
+                plan.append((tag, length, value))
+            case bytes() | bytearray() | memoryview():
+                length = len(value)
+                plan.append((tag, length, value))
+            case _:
+                raise TypeError(
+                    F"encode_tlv()| unsupported value type for tag '{tag.hex().upper()}': {type(value)}")
+
+        size += len(tag) + _length_size(length) + length
+
+    return size
+
+
+@lru_cache(maxsize=1024)
+def _encoded_tag(tag: str | bytes | ByteString) -> bytes:
+    tag = _tag_bytes(tag)
+    if not tag or tag[0] == 0x00 or read_tag(tag) != len(tag):
+        raise ValueError(
+            F"encode_tlv()| invalid tag: '{tag.hex().upper()}'")
+    return tag
+
+
+def _length_size(length: int) -> int:
+    # size of the length field
+    if length < 0x80:
+        return 1
+
+    nr_bytes = (length.bit_length() + 7) // 8
+    if nr_bytes > 0x7F:
+        raise ValueError(F"Cannot encode length > 2^1016")
+    return 1 + nr_bytes
+
+
+def _tag_bytes(tag: str | bytes | ByteString) -> bytes:
+    match tag:
+        case bytes():
+            return tag
+        case ByteString():
+            return tag.bytes
+        case _:
+            return bytes.fromhex(str(tag))
 
 
 # Old definitions
@@ -6,7 +6,8 @@ from collections import UserString
 from collections.abc import Sequence
 import math
 from typing import Iterable, SupportsInt
-from functools import reduce
+from functools import lru_cache
+import re
 from operator import __add__, __xor__, __and__, __or__, __lshift__, __rshift__
 import sys as _sys
 from array import array
@@ -15,6 +16,7 @@ import json
 # Third party imports
 
 # Local application imports
+from common.permutation import CompiledPermutation, compile_permutation, rotate_left
 
 
 # Helper functions
@@ -22,20 +24,23 @@ __HEX_DIGITS = '0123456789abcdefABCDEF'
 __BIT_DIGITS = '01'
 
 
-def _clean_char(keep: str, ignore: str, message: str):
-    def _clean_char(c: str):
-        if c in keep:
-            return c
-        elif c in ignore:
-            return ''
-        else:
-            raise TypeError(F"Character '{c}' not allowed in {message}")
+@lru_cache(maxsize=32)
+def _deletion_table(keep: str, ignore: str) -> dict[int, None]:
+    # characters in 'keep' are kept even if also in 'ignore'
+    return str.maketrans('', '', ''.join(c for c in ignore if c not in keep))
+
 
-    return _clean_char
+@lru_cache(maxsize=32)
+def _not_allowed(keep: str) -> re.Pattern:
+    return re.compile(F"[^{re.escape(keep)}]")
 
 
 def _clean_string(s: str, keep: str, ignore: str, message: str) -> str:
-    return reduce(__add__, map(_clean_char(keep, ignore, message), s))
+    cleaned = s.translate(_deletion_table(keep, ignore)) if ignore else s
+    if (match := _not_allowed(keep).search(cleaned)) is not None:
+        raise TypeError(F"Character '{match.group()}' not allowed in {message}")
+
+    return cleaned
 
 
 def _clean_hex_string(s: str, ignore: str = "_") -> str:
@@ -46,29 +51,21 @@ def _clean_bit_string(s: str, ignore: str = "_") -> str:
     return _clean_string(s, keep=__BIT_DIGITS, ignore=ignore, message="bit string")
 
 
-def _align_string(left, right):
-    match len(left)-len(right):
-        case l if l < 0:
-            # left is shorter
-            return left.lpad(len(right)), right
-        case l if l == 0:
-            # both are same length
-            return left, right
-        case l if l > 0:
-            # left is longer
-            return left, right.lpad(len(left))
-
-
 def _bitwise_operation(left, right, op):
+    # operands are right-aligned: the shorter one is left-padded with zeros, as by lpad()
     match left, right:
+        case ByteString(), HexString() if not isinstance(right, ByteString):
+            return _bitwise_operation(left, right.bytestring, op)
         case ByteString(), ByteString():
-            fmt = '02X'
+            size = max(len(left), len(right))
+            return op(int(left), int(right)).to_bytes(size, 'big')
         case HexString(), HexString():
-            fmt = 'X'
-        case BitString(), BitString():
-            fmt = 'X'
+            width = max(len(left), len(right))
+
+    if width == 0:
+        return ''
 
-    return ''.join(([format(op(int(l), int(r)), fmt) for l, r in zip(*_align_string(left, right))]))
+    return format(op(int(left.data or '0', 16), int(right.data or '0', 16)), F"0{width}X")
 
 
 class BinaryEncoder(json.JSONEncoder):
@@ -83,25 +80,54 @@ def json_dumps(obj):
     return json.dumps(obj, cls=BinaryEncoder)
 
 
+# bytes.translate() table inverting all bits of each byte
+_INVERT = bytes(0xFF - byte for byte in range(256))
+
+
 # 'BitString' class
 class BitString(UserString):
+    """BitString: sequence of bits, held as an int and a length
+
+    The '0'/'1' representation ('data', str()) is only built when needed, then kept.
+    """
+
     def __init__(self, value: int | Sequence, *, ignore: str = "_"):
         if isinstance(value, int):
-            value_string = format(value, "b")
+            if value < 0:
+                raise ValueError(
+                    F"BitString()| received negative integer: {value}")
+            self._value, self._length = value, max(1, value.bit_length())
         elif isinstance(value, str):
             value_string = _clean_bit_string(value, ignore)
-        elif isinstance(value, bytes):
-            value_string = ''.join([format(b, '08b') for b in value])
-        elif isinstance(value, list):
-            value_string = ''.join([format(b, '08b') for b in value])
+            self._value, self._length = int(value_string or '0', 2), len(value_string)
+        elif isinstance(value, (bytes, list)):
+            self._value, self._length = int.from_bytes(bytes(value), 'big'), 8 * len(value)
         else:
             raise TypeError(
                 F"BitString()| unsupported initializer type: {type(value)}")
 
-        super().__init__(value_string)
+        self._bits = None
+
+    @classmethod
+    def _from_int(cls, value: int, length: int) -> BitString:
+        # no validation: 'value' must hold on 'length' bits
+        bit_string = cls.__new__(cls)
+        bit_string._value = value
+        bit_string._length = length
+        bit_string._bits = None
+        return bit_string
+
+    @property
+    def data(self) -> str:
+        if self._bits is None:
+            self._bits = format(self._value, F"0{self._length}b") if self._length else ''
+        return self._bits
 
     def __int__(self) -> int:
-        return int(self.data, 2)
+        return self._value
+
+    def __len__(self) -> int:
+        return self._length
 
     def __repr__(self):
         return F"BitString('{self}')"
@@ -109,6 +135,26 @@ class BitString(UserString):
     def __hash__(self):
         return hash(self.data)
 
+    def __getitem__(self, key) -> BitString:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return BitString(self.data[key])
+            length = max(0, stop - start)
+            return BitString._from_int((self._value >> (self._length - start - length)) & ((1 << length) - 1), length)
+
+        if not -self._length <= key < self._length:
+            raise IndexError("BitString index out of range")
+        return BitString._from_int((self._value >> (self._length - 1 - key % self._length)) & 1, 1)
+
+    def __add__(self, other) -> BitString:
+        if not isinstance(other, BitString):
+            other = BitString(other.data if isinstance(other, UserString) else other)
+        return BitString._from_int((self._value << other._length) | other._value, self._length + other._length)
+
+    def __radd__(self, other) -> BitString:
+        return BitString(other) + self
+
     def __eq__(self, string: SupportsInt):
         return int(self) == int(string)
 
@@ -125,26 +171,26 @@ class BitString(UserString):
         return int(self) >= int(string)
 
     def __or__(self, other: BitString) -> BitString:
-        return BitString(_bitwise_operation(self, other, __or__))
+        return BitString._from_int(self._value | other._value, max(self._length, other._length))
 
     def __xor__(self, other: BitString) -> BitString:
-        return BitString(_bitwise_operation(self, other, __xor__))
+        return BitString._from_int(self._value ^ other._value, max(self._length, other._length))
 
     def __and__(self, other: BitString) -> BitString:
-        return BitString(_bitwise_operation(self, other, __and__))
+        return BitString._from_int(self._value & other._value, max(self._length, other._length))
 
     def __invert__(self) -> BitString:
-        return self ^ BitString('1' * len(self))
+        return BitString._from_int(self._value ^ ((1 << self._length) - 1), self._length)
 
     def lpad(self, size: int) -> BitString:
         if len(self) < size:
-            return BitString('0' * (size-len(self))) + self
+            return BitString._from_int(self._value, size)
         else:
             return self
 
     def rpad(self, size: int) -> BitString:
         if len(self) < size:
-            return self + BitString('0' * (size-len(self)))
+            return BitString._from_int(self._value << (size - self._length), size)
         else:
             return self
 
@@ -155,35 +201,41 @@ class BitString(UserString):
     # def join(self, seq: Iterable[BitString]) -> BitString:
     #     return reduce(__add__, seq)
 
-    def permute(self, permutation: list[int]) -> BitString:
-        str_out: str = ''
+    def permute(self, permutation: list[int] | CompiledPermutation) -> BitString:
+        if not isinstance(permutation, CompiledPermutation):
+            permutation = compile_permutation(permutation, self._length)
+        elif permutation.input_width != self._length:
+            raise ValueError(
+                F"BitString()| permutation of {permutation.input_width} bits applied to {self._length} bits")
 
-        for i in permutation:
-            str_out += str(self[i-1])
+        return BitString._from_int(permutation(self._value), permutation.output_width)
 
-        return BitString(str_out)
-
-    def expand(self, expansion: list[int]) -> BitString:
+    def expand(self, expansion: list[int] | CompiledPermutation) -> BitString:
         return self.permute(expansion)
 
     def left_circular_shit(self, shift: int) -> BitString:
-        return self[shift:] + self[:shift]
+        if shift >= self._length:
+            return self
+        return BitString._from_int(rotate_left(self._value, shift, self._length), self._length)
 
     @property
     def byte_string(self) -> ByteString:
-        if len(self) % 8 == 0:
-            return ByteString([int(b) for b in self.blocks(8)])
-        else:
-            return ByteString([int(b) for b in self.zfill(len(self)+8 - len(self) % 8).blocks(8)])
+        return ByteString(self._value.to_bytes((self._length + 7) // 8, 'big'))
 
 
 # 'HexString' class
 class HexString(UserString):
+    """HexString: string of hexadecimal digits, normalized to upper case
+
+    The int value is only computed when needed, then kept.
+    """
+    _int: int | None = None
+
     def __init__(self, value: int | Sequence, *, ignore: str = "_"):
         if isinstance(value, int):
             value_string = format(value, "X")
         elif isinstance(value, str):
-            value_string = _clean_hex_string(value, ignore)
+            value_string = _clean_hex_string(value, ignore).upper()
         elif isinstance(value, bytes):
             value_string = ''.join([format(b, '02X') for b in value])
         elif isinstance(value, list):
@@ -195,18 +247,24 @@ class HexString(UserString):
         super().__init__(value_string)
 
     def __int__(self) -> int:
-        return int(self.data, 16)
+        if self._int is None:
+            self._int = int(self.data, 16)
+        return self._int
 
     def __str__(self):
-        return str(self.data.upper())
+        return self.data
 
     def __repr__(self):
-        return F"HexString('{self}')"
+        return F"HexString('{self.data}')"
 
     def __hash__(self):
-        return hash(self.data.upper())
+        return hash(self.data)
 
     def __eq__(self, string: SupportsInt):
+        if isinstance(string, str):
+            if len(string) == len(self.data):
+                return self.data == string.upper()
+            return int(self) == int(string, 16)
         return int(self) == int(string)
 
     def __lt__(self, string: SupportsInt):
@@ -280,47 +338,110 @@ class HexString(UserString):
 
 # 'ByteString' class
 class ByteString(HexString):
+    """ByteString: immutable sequence of bytes, held as 'bytes'
+
+    The hexadecimal representation ('data', str()) is only built when needed, then kept.
+    """
+
     def __init__(self, value: int | Sequence, *, ignore: str = "_"):
         if isinstance(value, int):
-            value_string = format(value, "X")
-            if len(value_string) % 2 != 0:
-                value_string = '0' + value_string
+            if value < 0:
+                raise ValueError(
+                    F"ByteString()| received negative integer: {value}")
+            value_bytes = value.to_bytes(max(1, (value.bit_length() + 7) // 8), 'big')
         elif isinstance(value, str):
             value_string = _clean_hex_string(value, ignore)
             if len(value_string) % 2 != 0:
                 raise ValueError(
                     F"ByteString()| received off number of nibbles: {value_string}")
-        elif isinstance(value, bytes):
-            value_string = ''.join([format(b, '02X') for b in value])
+            value_bytes = bytes.fromhex(value_string)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            value_bytes = bytes(value)
+        elif isinstance(value, ByteString):
+            value_bytes = value._bytes
         elif isinstance(value, list):
-            value_string = ''.join([format(int(b), '02X') for b in value])
+            value_bytes = bytes([int(b) for b in value])
         else:
             raise TypeError(
                 F"ByteString()| unsupported initializer type: {type(value)}")
 
-        super().__init__(value_string)
+        self._bytes = value_bytes
+        self._hex = None
+
+    @classmethod
+    def _from_bytes(cls, value: bytes) -> ByteString:
+        # no validation nor copy: 'value' must be a 'bytes' object
+        if len(value) == 1 and cls is ByteString:
+            return _ONE_BYTE[value[0]]
+        byte_string = cls.__new__(cls)
+        byte_string._bytes = value
+        byte_string._hex = None
+        return byte_string
+
+    def _new(self, value: bytes) -> ByteString:
+        # same result type as the UserString methods: subclasses go through their own constructor
+        if type(self) is ByteString:
+            return ByteString._from_bytes(value)
+        return self.__class__(value.hex().upper())
+
+    @property
+    def data(self) -> str:
+        if self._hex is None:
+            self._hex = self._bytes.hex().upper()
+        return self._hex
 
     def __int__(self) -> int:
-        return int(self.data, 16)
+        if self._int is None:
+            self._int = int.from_bytes(self._bytes, 'big')
+        return self._int
 
     def __str__(self):
-        return str(self.data.upper())
+        return self.data
 
     def __repr__(self):
-        return F"ByteString('{self.data.upper()}')"
+        return F"ByteString('{self.data}')"
 
     def __getitem__(self, key) -> ByteString:
-        return ByteString(self.bytes[key])
+        if isinstance(key, slice):
+            return ByteString._from_bytes(self._bytes[key])
+        return _ONE_BYTE[self._bytes[key]]
+
+    def __iter__(self) -> Iterable[ByteString]:
+        return map(_ONE_BYTE.__getitem__, self._bytes)
 
     def __len__(self) -> int:
-        return len(self.bytes)
+        return len(self._bytes)
 
     def __hash__(self):
-        return hash(self.data.upper())
+        return hash(self.data)
+
+    def __add__(self, other) -> ByteString:
+        if isinstance(other, ByteString):
+            return self._new(self._bytes + other._bytes)
+        elif isinstance(other, (bytes, bytearray, memoryview)):
+            return self._new(self._bytes + other)
+        else:
+            # as UserString: other operands are concatenated as text, e.g. 12 as '12'
+            return self._new(self._bytes + ByteString(str(other))._bytes)
+
+    def __radd__(self, other) -> ByteString:
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self._new(bytes(other) + self._bytes)
+        else:
+            return self._new(ByteString(str(other))._bytes + self._bytes)
+
+    def __mul__(self, n: int) -> ByteString:
+        return self._new(self._bytes * n)
+
+    __rmul__ = __mul__
 
     def __eq__(self, string: SupportsInt):
         if isinstance(string, str):
+            if len(string) == 2 * len(self._bytes):
+                return self.data == string.upper()
             return int(self) == int(string, 16)
+        elif isinstance(string, ByteString) and len(string) == len(self):
+            return self._bytes == string._bytes
         else:
             return int(self) == int(string)
 
@@ -337,36 +458,49 @@ class ByteString(HexString):
         return int(self) >= int(string)
 
     def __or__(self, other: ByteString) -> ByteString:
-        return ByteString(_bitwise_operation(self, other, __or__))
+        return ByteString._from_bytes(_bitwise_operation(self, other, __or__))
 
     def __xor__(self, other: ByteString) -> ByteString:
-        return ByteString(_bitwise_operation(self, other, __xor__))
+        return ByteString._from_bytes(_bitwise_operation(self, other, __xor__))
 
     def __and__(self, other: ByteString) -> ByteString:
-        return ByteString(_bitwise_operation(self, other, __and__))
+        return ByteString._from_bytes(_bitwise_operation(self, other, __and__))
 
     def __invert__(self) -> ByteString:
-        return self ^ ByteString('FF' * len(self))
+        return ByteString._from_bytes(self._bytes.translate(_INVERT))
 
     @property
     def bytes(self) -> bytes:
-        return bytes.fromhex(self.data)
+        return self._bytes
 
     @property
     def list(self):
-        return [int(b) for b in self.bytes]
+        return list(self._bytes)
 
     @property
     def array(self):
-        return array('B', self.bytes)
+        return array('B', self._bytes)
+
+    @property
+    def memoryview(self) -> memoryview:
+        return memoryview(self._bytes)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        # PEP 688 (Python 3.12+): memoryview(byte_string), hashlib, sockets... read the bytes in place
+        return memoryview(self._bytes)
 
     @property
     def bit_string(self) -> BitString:
         return BitString(self.bytes)
 
     def blocks(self, blocksize: int) -> Iterable[ByteString]:
-        nr_blocks = math.ceil(len(self) / blocksize)
-        return (self[i*blocksize:(i+1)*blocksize] for i in range(nr_blocks))
+        """blocks(): 'blocksize' bytes blocks, the last one possibly shorter, as views on the ByteString
+        """
+        if blocksize == 1:
+            return iter(self)
+        view = self.memoryview
+        return (ByteStringView._from_view(view[offset:offset+blocksize], self, offset)
+                for offset in range(0, len(view), blocksize))
 
     def lpad(self, size: int) -> ByteString:
         return self.zfill(2*size)
@@ -391,6 +525,233 @@ class ByteString(HexString):
 
     def startswith(self, prefix, start=0, end=_sys.maxsize):
         if isinstance(prefix, str):
-            return self.data.upper().startswith(prefix.upper(), start, end)
+            return self.data.startswith(prefix.upper(), start, end)
         else:
-            return self.data.upper().startswith(map(upper, prefix), start, end)
+            return self.data.startswith(tuple(p.upper() for p in prefix), start, end)
+
+
+# 'ByteStringView' class
+class ByteStringView(ByteString):
+    """ByteStringView: ByteString referencing 'length' bytes of 'parent' from 'offset', without copy
+
+    Length, indexing, slicing, blocks() and the buffer protocol work on the parent
+    bytes; the other ByteString operations copy the referenced bytes once.
+    """
+
+    def __init__(self, parent: ByteString | bytes | str, offset: int = 0, length: int | None = None):
+        if isinstance(parent, ByteStringView):
+            view = parent._view
+        elif isinstance(parent, ByteString):
+            view = memoryview(parent.bytes)
+        elif isinstance(parent, bytes):
+            view = memoryview(parent)
+        else:
+            # UserString methods build their results from text
+            view = memoryview(ByteString(parent).bytes)
+
+        if not 0 <= offset <= len(view) or (length is not None and not 0 <= length <= len(view) - offset):
+            raise ValueError(
+                F"ByteStringView()| offset {offset} and length {length} out of the {len(view)} parent bytes")
+
+        self._parent = parent
+        self._offset = offset
+        self._view = view[offset:] if length is None else view[offset:offset+length]
+        self._copy = None
+        self._hex = None
+
+    @classmethod
+    def _from_view(cls, view: memoryview, parent: ByteString, offset: int) -> ByteStringView:
+        # no validation: 'view' must be the bytes of 'parent' from 'offset'
+        byte_string_view = cls.__new__(cls)
+        byte_string_view._parent = parent
+        byte_string_view._offset = offset
+        byte_string_view._view = view
+        byte_string_view._copy = None
+        byte_string_view._hex = None
+        return byte_string_view
+
+    @property
+    def _bytes(self) -> bytes:
+        if self._copy is None:
+            self._copy = self._view.tobytes()
+        return self._copy
+
+    def _new(self, value: bytes) -> ByteString:
+        return ByteString._from_bytes(value)
+
+    @property
+    def parent(self) -> ByteString | bytes | str:
+        return self._parent
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    @property
+    def length(self) -> int:
+        return len(self._view)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __repr__(self):
+        return F"ByteStringView('{self.data}')"
+
+    def __reduce__(self):
+        return ByteString, (self._bytes,)
+
+    def __getitem__(self, key) -> ByteString:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self._view))
+            if step != 1:
+                return ByteString._from_bytes(self._view[key].tobytes())
+            if stop - start == 1:
+                return _ONE_BYTE[self._view[start]]
+            return ByteStringView._from_view(self._view[start:stop], self, start)
+
+        return _ONE_BYTE[self._view[key]]
+
+    def __iter__(self) -> Iterable[ByteString]:
+        return map(_ONE_BYTE.__getitem__, self._view)
+
+    @property
+    def memoryview(self) -> memoryview:
+        return self._view
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self._view
+
+
+# Interned ByteStrings
+# Shared instances for the 256 one-byte values (slicing, iteration, blocks(1)) and
+# for the constants registered with register_interned() (status words, tags...).
+def _one_byte(value: int) -> ByteString:
+    byte_string = ByteString.__new__(ByteString)
+    byte_string._bytes = bytes((value,))
+    byte_string._hex = F"{value:02X}"
+    return byte_string
+
+
+_ONE_BYTE = tuple(_one_byte(value) for value in range(256))
+_interned: dict[bytes, ByteString] = {b._bytes: b for b in _ONE_BYTE}
+_interned_text: dict[str, ByteString] = {**{b.data: b for b in _ONE_BYTE}, **{b.data.lower(): b for b in _ONE_BYTE}}
+
+
+def interned(value: int | Sequence) -> ByteString:
+    """interned(): shared ByteString for one-byte values and registered constants, a new ByteString otherwise
+
+    The registered hexadecimal strings are looked up without validation.
+    """
+    if isinstance(value, str):
+        byte_string = _interned_text.get(value)
+        if byte_string is not None:
+            return byte_string
+
+    byte_string = value if type(value) is ByteString else ByteString(value)
+    return _interned.get(byte_string._bytes, byte_string)
+
+
+def register_interned(*values: int | Sequence) -> None:
+    """register_interned(): adds 'values' to the constants returned by interned()
+    """
+    for value in values:
+        byte_string = _interned.setdefault(interned(value)._bytes, interned(value))
+        _interned_text[byte_string.data] = _interned_text[byte_string.data.lower()] = byte_string
+
+
+# 'ByteBuffer' class
+class ByteBuffer(bytearray):
+    """ByteBuffer: mutable bytes to assemble messages and for hot loops
+
+    append(), extend() and += take ints, ByteStrings, hexadecimal strings and bytes
+    like objects, and return the buffer so that calls can be chained. freeze() ends
+    the assembly with an immutable ByteString.
+
+    The operands of ^=, &= and |= are right-aligned as for ByteString: a shorter
+    operand is left-padded with zeros, a longer one extends the buffer on the left.
+    """
+
+    def append(self, value: int | ByteString) -> ByteBuffer:
+        """append(): adds one byte, given as an int or a one-byte ByteString
+        """
+        if isinstance(value, int):
+            super().append(value)
+        elif len(value) == 1:
+            self.extend(value)
+        else:
+            raise ValueError(
+                F"ByteBuffer()| append() expects one byte, received: {value}")
+        return self
+
+    def extend(self, value: ByteString | str | bytes | Iterable[int]) -> ByteBuffer:
+        """extend(): adds the bytes of 'value'
+        """
+        if isinstance(value, ByteString):
+            value = value.memoryview
+        elif isinstance(value, (str, UserString)):
+            value = ByteString(str(value)).bytes
+        super().extend(value)
+        return self
+
+    def __iadd__(self, value: ByteString | str | bytes | Iterable[int]) -> ByteBuffer:
+        return self.extend(value)
+
+    def pad_iso9797(self, method: int, *, block_size: int = 8) -> ByteBuffer:
+        """pad_iso9797(): ISO/IEC 9797-1 padding method 1 ('00' bytes, at least one block) or 2 ('80' then '00' bytes)
+        """
+        match method:
+            case 1:
+                if len(self) % block_size or not self:
+                    super().extend(bytes(block_size - len(self) % block_size))
+            case 2:
+                super().append(0x80)
+                super().extend(bytes(-len(self) % block_size))
+            case _:
+                raise ValueError(
+                    F"ByteBuffer()| unsupported ISO/IEC 9797-1 padding method: {method}")
+        return self
+
+    def xor_into(self, other: ByteString | bytes, offset: int = 0) -> ByteBuffer:
+        """xor_into(): XORs 'other' in place into the bytes starting at 'offset'
+        """
+        other = other.memoryview if isinstance(other, ByteString) else other
+        end = offset + len(other)
+        if offset < 0 or end > len(self):
+            raise ValueError(
+                F"ByteBuffer()| {len(other)} bytes at offset {offset} exceed the {len(self)} buffer bytes")
+
+        self[offset:end] = (int.from_bytes(self[offset:end], 'big') ^ int.from_bytes(other, 'big')).to_bytes(end - offset, 'big')
+        return self
+
+    def freeze(self) -> ByteString:
+        """freeze(): the buffer content as a ByteString
+
+        The content is copied: the buffer can still be modified, the ByteString is not.
+        """
+        return ByteString._from_bytes(bytes(self))
+
+    def __ixor__(self, other: ByteString | bytes) -> ByteBuffer:
+        return self._in_place(other, __xor__)
+
+    def __iand__(self, other: ByteString | bytes) -> ByteBuffer:
+        return self._in_place(other, __and__)
+
+    def __ior__(self, other: ByteString | bytes) -> ByteBuffer:
+        return self._in_place(other, __or__)
+
+    def invert(self) -> ByteBuffer:
+        """invert(): inverts all bits in place
+        """
+        self[:] = self.translate(_INVERT)
+        return self
+
+    def __repr__(self):
+        return F"ByteBuffer('{self.hex().upper()}')"
+
+    def _in_place(self, other: ByteString | bytes, op) -> ByteBuffer:
+        other = other.bytes if isinstance(other, ByteString) else other
+        if len(other) > len(self):
+            self[0:0] = bytes(len(other) - len(self))
+
+        self[:] = op(int.from_bytes(self, 'big'), int.from_bytes(other, 'big')).to_bytes(len(self), 'big')
+        return self
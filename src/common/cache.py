@@ -0,0 +1,133 @@
+"""cache.py: bounded caches
+"""
+# Standard library imports
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, NamedTuple
+
+# Third party imports
+
+# Local application imports
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    capacity: int
+
+
+# 'LruCache' class
+class LruCache:
+    """LruCache: thread-safe Least Recently Used cache holding at most 'capacity' entries
+    """
+
+    def __init__(self, capacity: int = 128):
+        if capacity < 0:
+            raise ValueError(
+                F"LruCache()| capacity should be positive or zero, received: {capacity}")
+
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._capacity = capacity
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        if capacity < 0:
+            raise ValueError(
+                F"LruCache()| capacity should be positive or zero, received: {capacity}")
+
+        with self._lock:
+            self._capacity = capacity
+            self._evict()
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._entries), self._capacity)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self._misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """get_or_create(): cached value for 'key', created with 'factory' on a miss
+
+        The factory runs outside the lock; if two threads miss on the same key,
+        the first value stored is kept.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self._misses += 1
+
+        value = factory()
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+
+            self._entries[key] = value
+            self._evict()
+
+        return value
+
+    def clear(self) -> None:
+        """clear(): drops all entries, counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def _evict(self) -> None:
+        # must be called with the lock held
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+            self._evictions += 1
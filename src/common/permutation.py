@@ -0,0 +1,89 @@
+"""permutation.py: bit permutations compiled to byte-indexed lookup tables
+
+A permutation is given as a list of 1-based input bit positions, counted from
+the most significant bit, one per output bit (e.g. the DES tables _IP, _PC1, _E,
+_P). Once compiled, it is applied to an integer with one table lookup and one OR
+per input byte, instead of one operation per output bit.
+"""
+# Standard library imports
+from functools import lru_cache
+from typing import NamedTuple, Sequence
+
+# Third party imports
+
+# Local application imports
+
+
+class CompiledPermutation(NamedTuple):
+    tables: tuple[tuple[int, ...], ...]
+    input_width: int
+    output_width: int
+
+    def __call__(self, value: int) -> int:
+        return permute(value, self.tables)
+
+
+def compile_permutation(permutation: Sequence[int], width: int) -> CompiledPermutation:
+    """compile_permutation(): lookup tables applying 'permutation' to a 'width'-bit integer
+
+    Compiled permutations are cached, compiling the same permutation again is cheap.
+    """
+    return _compile(tuple(permutation), width)
+
+
+def compile_rotation(width: int, shift: int) -> CompiledPermutation:
+    """compile_rotation(): left circular shift of a 'width'-bit integer by 'shift' bits, as a permutation
+    """
+    return _compile(tuple((i + shift) % width + 1 for i in range(width)), width)
+
+
+def permute(value: int, tables: Sequence[Sequence[int]]) -> int:
+    """permute(): applies the tables of a compiled permutation to 'value'
+    """
+    permuted = 0
+    shift = 8 * (len(tables) - 1)
+    for table in tables:
+        permuted |= table[(value >> shift) & 0xFF]
+        shift -= 8
+
+    return permuted
+
+
+def rotate_left(value: int, shift: int, width: int) -> int:
+    """rotate_left(): left circular shift of a 'width'-bit integer
+    """
+    if width == 0:
+        return value
+
+    shift %= width
+    return ((value << shift) | (value >> (width - shift))) & ((1 << width) - 1)
+
+
+#
+# helper functions
+#
+@lru_cache(maxsize=128)
+def _compile(permutation: tuple[int, ...], width: int) -> CompiledPermutation:
+    if any(not 1 <= input_bit <= width for input_bit in permutation):
+        raise ValueError(
+            F"compile_permutation()| bit positions should be in 1..{width}, received: {permutation}")
+
+    # the input is left-padded to a whole number of bytes
+    nr_bytes = (width + 7) // 8
+    padding = 8 * nr_bytes - width
+
+    # output bits driven by each padded input bit (1-based, counted from the MSB)
+    masks = [0] * (8 * nr_bytes + 1)
+    for output_bit, input_bit in enumerate(permutation):
+        masks[padding + input_bit] |= 1 << (len(permutation) - 1 - output_bit)
+
+    tables: list[tuple[int, ...]] = []
+    for byte_index in range(nr_bytes):
+        table = [0] * 256
+        for value in range(1, 256):
+            lowest_bit = value & -value
+            input_bit = 8 * byte_index + 9 - lowest_bit.bit_length()
+            table[value] = table[value ^ lowest_bit] | masks[input_bit]
+        tables.append(tuple(table))
+
+    return CompiledPermutation(tuple(tables), width, len(permutation))
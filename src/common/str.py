@@ -8,28 +8,35 @@ Generic functions working on strings
 # Third party imports
 
 # Local application imports
+from common.permutation import CompiledPermutation
 
 
-def perm(str_in: str, permutation: list[int]) -> str:
-    """perm():
-    """
-    str_out = ''
+def perm(str_in: str, permutation: list[int] | CompiledPermutation) -> str:
+    """perm(): 'str_in' characters in the order of 'permutation' (1-based positions)
 
-    for i in permutation:
-        str_out += str_in[i-1]
+    A CompiledPermutation only applies to bit strings ('0'/'1' characters).
+    """
+    if isinstance(permutation, CompiledPermutation):
+        return format(permutation(int(str_in, 2)), F"0{permutation.output_width}b")
 
-    return str_out
+    return ''.join([str_in[i-1] for i in permutation])
 
 
-def exp(str_in: str, expansion: list[int]) -> str:
+def exp(str_in: str, expansion: list[int] | CompiledPermutation) -> str:
     """exp():
     """
     return perm(str_in, expansion)
 
 
-def lcs(str_in: str, shift: int) -> str:
-    """lcs():
+def lcs(str_in: str, shift: int | CompiledPermutation) -> str:
+    """lcs(): left circular shift of 'str_in' by 'shift' characters
+
+    A CompiledPermutation (see common.permutation.compile_rotation()) only applies
+    to bit strings ('0'/'1' characters).
     """
+    if isinstance(shift, CompiledPermutation):
+        return perm(str_in, shift)
+
     return str_in[shift:] + str_in[:shift]
 
 
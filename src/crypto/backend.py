@@ -0,0 +1,299 @@
+"""backend.py: pluggable DES/3DES backends
+
+The rest of the library encrypts through the functions of this module, which
+forward to the active backend:
+- 'reference': BitString implementation of crypto.des (slow, follows FIPS 46-3 literally)
+- 'table': table-driven integer implementation of crypto.des
+- 'numpy': crypto.des_numpy, only available when NumPy is installed
+- 'cryptography': OpenSSL through the 'cryptography' package, only available when installed
+
+The fastest available backend is selected at import time, unless the environment
+variable GEP3_CRYPTO_BACKEND names another one; select_backend() switches at runtime.
+"""
+
+# Standard library imports
+from abc import ABC, abstractmethod
+import os
+
+# Third party imports
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, modes as _modes
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import TripleDES
+    except ImportError:  # cryptography < 43
+        from cryptography.hazmat.primitives.ciphers.algorithms import TripleDES
+except ImportError:  # cryptography is optional, see CryptographyBackend
+    Cipher = None
+
+# Local application imports
+from common.binary import ByteString
+from crypto import des, des_numpy
+from crypto.modes import BlockCipher
+
+
+ENVIRONMENT_VARIABLE = 'GEP3_CRYPTO_BACKEND'
+
+
+# 'Backend' class
+class Backend(ABC):
+    """Backend: factory of crypto.modes.BlockCipher objects for 8, 16 or 24-byte keys
+    """
+    name: str
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def key(self, key: bytes) -> BlockCipher:
+        ...
+
+    def cbc_encrypt(self, key: bytes, data: bytes, iv: bytes) -> bytes:
+        cipher = self.key(key)
+        chaining = iv
+        ciphertext = bytearray()
+        for i in range(0, len(data), 8):
+            chaining = cipher.encrypt_block(_xor(chaining, data[i:i+8]))
+            ciphertext += chaining
+
+        return bytes(ciphertext)
+
+    def cbc_decrypt(self, key: bytes, data: bytes, iv: bytes) -> bytes:
+        if not data:
+            return b''
+
+        # all blocks are decrypted at once, then XORed with the previous ciphertext blocks
+        return _xor(self.key(key).decrypt_blocks(data), iv + data[:-8])
+
+    def __repr__(self):
+        return F"{type(self).__name__}('{self.name}')"
+
+
+class ReferenceBackend(Backend):
+    name = 'reference'
+
+    def key(self, key: bytes) -> BlockCipher:
+        return _EngineKey(des.expand_key(key), des.DesEngine.BitString)
+
+
+class TableBackend(Backend):
+    name = 'table'
+
+    def key(self, key: bytes) -> BlockCipher:
+        return _EngineKey(des.expand_key(key), des.DesEngine.Table)
+
+
+class NumpyBackend(Backend):
+    name = 'numpy'
+
+    def available(self) -> bool:
+        return des_numpy.available()
+
+    def key(self, key: bytes) -> BlockCipher:
+        return des_numpy.NumpyDeaKey(key)
+
+
+class CryptographyBackend(Backend):
+    name = 'cryptography'
+
+    def available(self) -> bool:
+        return Cipher is not None
+
+    def key(self, key: bytes) -> BlockCipher:
+        return _CryptographyKey(key)
+
+    def cbc_encrypt(self, key: bytes, data: bytes, iv: bytes) -> bytes:
+        encryptor = Cipher(TripleDES(_triple_length_key(key)), _modes.CBC(iv)).encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    def cbc_decrypt(self, key: bytes, data: bytes, iv: bytes) -> bytes:
+        decryptor = Cipher(TripleDES(_triple_length_key(key)), _modes.CBC(iv)).decryptor()
+        return decryptor.update(data) + decryptor.finalize()
+
+
+# Registry; the automatic selection takes the first available 'auto' backend, in registration order
+_backends: dict[str, Backend] = {}
+_auto_selection: list[str] = []
+_active: Backend
+
+
+def register_backend(backend: Backend, *, auto: bool = False) -> None:
+    """register_backend(): makes 'backend' selectable by name, and by the automatic selection if 'auto'
+
+    Backends are registered from the most to the least preferred one.
+    """
+    _backends[backend.name] = backend
+    if auto and backend.name not in _auto_selection:
+        _auto_selection.append(backend.name)
+
+
+def available_backends() -> list[str]:
+    """available_backends(): names of the registered backends that can be used here
+    """
+    return [name for name, backend in _backends.items() if backend.available()]
+
+
+def select_backend(name: str | None = None) -> Backend:
+    """select_backend(): activates backend 'name', or the fastest available one if None
+    """
+    global _active
+
+    if name is None:
+        name = next(name for name in _auto_selection if _backends[name].available())
+
+    if name not in _backends:
+        raise ValueError(
+            F"Unknown crypto backend '{name}', expected one of: {', '.join(_backends)}")
+
+    if not _backends[name].available():
+        raise ValueError(
+            F"Crypto backend '{name}' is not available, available backends: {', '.join(available_backends())}")
+
+    _active = _backends[name]
+    return _active
+
+
+def active_backend() -> Backend:
+    """active_backend(): backend currently used by the functions of this module
+    """
+    return _active
+
+
+# Functions used by the rest of the library
+def encrypt(key: ByteString, block_8B: ByteString) -> ByteString:
+    """encrypt(): DES or triple DES encryption of a single block, depending on the key length
+    """
+    return ByteString(_active.key(_key_bytes(key)).encrypt_block(des.check_length(block_8B, 8)))
+
+
+def decrypt(key: ByteString, block_8B: ByteString) -> ByteString:
+    """decrypt(): DES or triple DES decryption of a single block, depending on the key length
+    """
+    return ByteString(_active.key(_key_bytes(key)).decrypt_block(des.check_length(block_8B, 8)))
+
+
+def ecb_encrypt(key: ByteString, block_8B_n: ByteString) -> ByteString:
+    """ecb_encrypt(): DES or triple DES encryption in ECB mode
+    """
+    return ByteString(_active.key(_key_bytes(key)).encrypt_blocks(des.check_blocks(block_8B_n)))
+
+
+def ecb_decrypt(key: ByteString, block_8B_n: ByteString) -> ByteString:
+    """ecb_decrypt(): DES or triple DES decryption in ECB mode
+    """
+    return ByteString(_active.key(_key_bytes(key)).decrypt_blocks(des.check_blocks(block_8B_n)))
+
+
+def cbc_encrypt(key: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
+    """cbc_encrypt(): DES or triple DES encryption in CBC mode
+    """
+    return ByteString(_active.cbc_encrypt(_key_bytes(key), des.check_blocks(block_8B_n), des.check_length(iv_8B, 8)))
+
+
+def cbc_decrypt(key: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
+    """cbc_decrypt(): DES or triple DES decryption in CBC mode
+    """
+    return ByteString(_active.cbc_decrypt(_key_bytes(key), des.check_blocks(block_8B_n), des.check_length(iv_8B, 8)))
+
+
+def mac(key: ByteString, block_8B_n: ByteString, iv: ByteString = ByteString('00' * 8)) -> ByteString:
+    """mac(): ISO/IEC 9797-1 MAC algorithm 1 with a 8-byte key, algorithm 3 (retail MAC) with a 16-byte key
+    """
+    key_bytes = _key_bytes(key)
+    if len(key_bytes) not in (8, 16):
+        raise ValueError(
+            F"Expected 8 or 16 bytes, received {len(key_bytes)}: {key}")
+
+    block_8B_n, iv = des.check_blocks(block_8B_n), des.check_length(iv, 8)
+    if not block_8B_n:
+        raise ValueError("Expected blocks of 8 bytes, received an empty message")
+
+    mac = _active.cbc_encrypt(key_bytes[0:8], block_8B_n, iv)[-8:]
+    if len(key_bytes) == 16:
+        mac = _active.key(key_bytes[8:16]).decrypt_block(mac)
+        mac = _active.key(key_bytes[0:8]).encrypt_block(mac)
+
+    return ByteString(mac)
+
+
+#
+# helper classes
+#
+class _EngineKey:
+    """_EngineKey: des.DeaKey pinned to one engine of crypto.des
+    """
+    block_size = 8
+
+    def __init__(self, key: des.DeaKey, engine: des.DesEngine):
+        self._key = key
+        self._engine = engine
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        return self._key.encrypt_block(block, engine=self._engine)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        return self._key.decrypt_block(block, engine=self._engine)
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        return self._key.encrypt_blocks(data, engine=self._engine)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        return self._key.decrypt_blocks(data, engine=self._engine)
+
+
+class _CryptographyKey:
+    """_CryptographyKey: TripleDES in ECB mode of the 'cryptography' package
+    """
+    block_size = 8
+
+    def __init__(self, key: bytes):
+        self._cipher = Cipher(TripleDES(_triple_length_key(key)), _modes.ECB())
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        return self._crypt(self._cipher.encryptor(), des.check_length(block, 8))
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        return self._crypt(self._cipher.decryptor(), des.check_length(block, 8))
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        return self._crypt(self._cipher.encryptor(), des.check_blocks(data))
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        return self._crypt(self._cipher.decryptor(), des.check_blocks(data))
+
+    @staticmethod
+    def _crypt(context, data: bytes) -> bytes:
+        return context.update(data) + context.finalize()
+
+
+#
+# helper functions
+#
+def _key_bytes(key: ByteString) -> bytes:
+    return key if isinstance(key, bytes) else des.to_bytes(key)
+
+
+def _triple_length_key(key: bytes) -> bytes:
+    # K1 K2 K3 with K3 = K1 for a 16-byte key and K1 = K2 = K3 for a 8-byte key
+    match len(key):
+        case 8:
+            return key * 3
+        case 16:
+            return key + key[0:8]
+        case 24:
+            return key
+        case _:
+            raise ValueError(
+                F"Expected 8, 16 or 24 bytes, received {len(key)}: {key.hex().upper()}")
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    return (int.from_bytes(left, 'big') ^ int.from_bytes(right, 'big')).to_bytes(len(left), 'big')
+
+
+# in order of preference: cryptography > numpy > table
+register_backend(CryptographyBackend(), auto=True)
+register_backend(NumpyBackend(), auto=True)
+register_backend(TableBackend(), auto=True)
+register_backend(ReferenceBackend())
+
+select_backend(os.environ.get(ENVIRONMENT_VARIABLE) or None)
@@ -2,14 +2,19 @@
 """
 
 # Standard library imports
+import copy
+from enum import IntEnum, StrEnum
 from functools import reduce
-from operator import __add__, __xor__
+from operator import __add__, __xor__, __or__, itemgetter
+import struct
+from typing import Callable, Iterable, Sequence
 
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString, BitString
-import crypto.modes as modes
+from common.binary import ByteString, BitString, HexString
+from common.cache import LruCache
+from common.permutation import compile_permutation, permute, rotate_left
 
 _IP = [58, 50, 42, 34, 26, 18, 10, 2, 60, 52, 44, 36, 28, 20, 12, 4, 62, 54, 46, 38, 30, 22, 14, 6, 64, 56, 48, 40, 32, 24, 16,
        8, 57, 49, 41, 33, 25, 17, 9, 1, 59, 51, 43, 35, 27, 19, 11, 3, 61, 53, 45, 37, 29, 21, 13, 5, 63, 55, 47, 39, 31, 23, 15, 7]
@@ -40,479 +45,392 @@ _S = [{'110000': '1111', '110001': '0101', '110101': '0011', '110100': '1001', '
       {'110000': '0000', '110001': '1111', '110101': '1001', '110100': '1010', '010100': '0011', '010101': '0110', '001100': '1011', '001101': '0111', '011110': '0111', '011111': '0010', '001001': '1010', '001000': '0110', '011011': '1110', '011010': '0000', '000110': '0100', '000111': '1000', '000011': '1111', '000010': '0010', '100100': '0100', '100101': '1110', '111100': '0101', '111101': '0110', '100010': '1011', '100011': '0001', '101110': '0010', '101111': '1101', '111001': '0011', '111000': '1111', '101011': '1010', '101010': '1100', '110011': '1100', '110010': '0110', '010010': '1001', '010011': '0101', '010111': '1011', '010110': '1110', '110110': '1101', '110111': '0000', '011000': '0101', '011001': '0000', '001111': '0100', '001110': '0001', '011101': '1001', '011100': '1100', '001010': '1111', '001011': '0011', '101101': '1000', '000000': '1101', '000001': '0001', '100111': '0111', '100110': '0001', '000101': '1101', '000100': '1000', '111111': '1011', '111110': '1000', '100001': '0010', '100000': '0111', '010001': '1100', '010000': '1010', '101100': '1110', '111010': '0011', '111011': '0101', '101000': '1001', '101001': '0100'}]
 
 
-def dea_e(key_8B: ByteString, block_8B: ByteString) -> ByteString:
-    """dea_e: DES encryption algorithm
-    """
-    # checking inputs
-    if len(key_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(key_8B)}: {key_8B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
 
-    # converting the input from hexadecimal string to bit string
-    key_64 = key_8B.bit_string
-    block_64 = block_8B.bit_string
+# DEA engines
+class DesEngine(StrEnum):
+    BitString = 'bitstring'
+    Table = 'table'
 
-    # pre-computing the 16 round keys
-    roundkeys = _roundkeys(key_64)
 
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+_engine = DesEngine.Table
 
-    for roundkey in roundkeys:
-        (L_32, R_32) = _round(roundkey, L_32, R_32)
 
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
-
-    return block_64.byte_string
+def set_engine(engine: DesEngine | str) -> None:
+    """set_engine(): selects the DEA implementation used by this module
+    """
+    global _engine
+    _engine = DesEngine(engine)
 
 
-def dea_d(key_8B: ByteString, block_8B: ByteString) -> ByteString:
-    """dea_d: DES decryption algorithm
+def get_engine() -> DesEngine:
+    """get_engine(): DEA implementation currently used by this module
     """
-    # checking inputs
-    if len(key_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(key_8B)}: {key_8B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
+    return _engine
 
-    # converting the input from hexadecimal string to bit string
-    key_64 = key_8B.bit_string
-    block_64 = block_8B.bit_string
 
-    # pre-computing the 16 round keys
-    roundkeys = _roundkeys(key_64)
+# Expanded keys
+class DeaKey:
+    """DeaKey: DEA key whose round keys are expanded once and reused for every block
+    """
+    block_size = 8
 
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+    def __len__(self) -> int:
+        return len(self._key)
 
-    for roundkey in reversed(roundkeys):
-        (L_32, R_32) = _round(roundkey, L_32, R_32)
+    def roundkeys(self, *, decrypt: bool = False) -> list[tuple[tuple[int, ...], ...]]:
+        """roundkeys(): round keys of each DEA pass, as 8 6-bit S-box inputs per round
+        """
+        return list(self._decryption if decrypt else self._encryption)
 
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
+    def encrypt_block(self, block: bytes, *, engine: DesEngine | None = None) -> bytes:
+        return self._crypt_block(block, decrypt=False, engine=engine)
 
-    return block_64.byte_string
+    def decrypt_block(self, block: bytes, *, engine: DesEngine | None = None) -> bytes:
+        return self._crypt_block(block, decrypt=True, engine=engine)
 
+    def encrypt_blocks(self, data: bytes, *, engine: DesEngine | None = None) -> bytes:
+        return self._crypt_blocks(data, decrypt=False, engine=engine)
 
-def dea_ede_cbc(key_8B: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
-    """dea_ede_cbc: Single DES encryption algorithm in CBC mode
-    """
-    # checking inputs
-    if len(key_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(key_8B)}: {key_8B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-    if len(iv_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(iv_8B)}: {iv_8B}")
+    def decrypt_blocks(self, data: bytes, *, engine: DesEngine | None = None) -> bytes:
+        return self._crypt_blocks(data, decrypt=True, engine=engine)
 
-    return modes.cbc_encryption(dea_e, key_8B, block_8B_n.blocks(8), iv_8B)
+    def ecb_encrypt(self, block_8B_n: ByteString) -> ByteString:
+        """ecb_encrypt(): encryption in ECB mode
+        """
+        return ByteString(self.encrypt_blocks(check_blocks(block_8B_n)))
 
+    def ecb_decrypt(self, block_8B_n: ByteString) -> ByteString:
+        """ecb_decrypt(): decryption in ECB mode
+        """
+        return ByteString(self.decrypt_blocks(check_blocks(block_8B_n)))
 
-def tdea_2_ede(key_16B: ByteString, block_8B: ByteString) -> ByteString:
-    """tdea_2_ede: Triple DES encryption algorithm
-    """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
+    def cbc_encrypt(self, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
+        """cbc_encrypt(): encryption in CBC mode
+        """
+        blocks = _unpack_blocks(check_blocks(block_8B_n))
+        chaining = int.from_bytes(check_length(iv_8B, 8), 'big')
+        cipher = self._cipher(decrypt=False)
 
-    # converting the input from hexadecimal string to bit string
-    key_128 = key_16B.bit_string
-    key_64 = key_128[0:64]
-    block_64 = block_8B.bit_string
+        ciphertext_blocks: list[int] = []
+        for block in blocks:
+            chaining = cipher(chaining ^ block)
+            ciphertext_blocks.append(chaining)
 
-    #
-    # DES encryption with key #1
-    #
+        return ByteString(_pack_blocks(ciphertext_blocks))
 
-    # pre-computing the 16 round keys
-    roundkeys1 = _roundkeys(key_64)
+    def cbc_decrypt(self, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
+        """cbc_decrypt(): decryption in CBC mode
+        """
+        blocks = _unpack_blocks(check_blocks(block_8B_n))
+        chaining = int.from_bytes(check_length(iv_8B, 8), 'big')
+        cipher = self._cipher(decrypt=True)
 
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+        plaintext_blocks: list[int] = []
+        for block in blocks:
+            plaintext_blocks.append(chaining ^ cipher(block))
+            chaining = block
 
-    for roundkey1 in roundkeys1:
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
+        return ByteString(_pack_blocks(plaintext_blocks))
 
-    block_64 = R_32 + L_32
+    def _cipher(self, *, decrypt: bool, engine: DesEngine | None = None) -> Callable[[int], int]:
+        """_cipher(): 64-bit block function for 'engine', or the currently selected engine
+        """
+        match engine or _engine:
+            case DesEngine.Table:
+                schedules = self._decryption if decrypt else self._encryption
+                return lambda block_64: _table_block(block_64, schedules)
 
-    #
-    # DES decryption with key #2
-    #
+            case DesEngine.BitString:
+                passes = self._decryption_passes if decrypt else self._encryption_passes
+                return lambda block_64: int.from_bytes(_bitstring_crypt(passes, block_64.to_bytes(8, 'big')), 'big')
 
-    key_64 = key_128[64:128]
+            case _:
+                raise ValueError(
+                    F"Unknown DEA engine '{engine}', expected one of: {', '.join(DesEngine)}")
 
-    # pre-computing the 16 round keys
-    roundkeys2 = _roundkeys(key_64)
+    def _crypt_block(self, block: bytes, *, decrypt: bool, engine: DesEngine | None) -> bytes:
+        if len(block) != 8:
+            raise ValueError(
+                F"Expected 8 bytes, received {len(block)}: {bytes(block).hex().upper()}")
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+        return self._cipher(decrypt=decrypt, engine=engine)(int.from_bytes(block, 'big')).to_bytes(8, 'big')
 
-    for roundkey2 in reversed(roundkeys2):
-        (L_32, R_32) = _round(roundkey2, L_32, R_32)
+    def _crypt_blocks(self, data: bytes, *, decrypt: bool, engine: DesEngine | None) -> bytes:
+        if (len(data) % 8) != 0:
+            raise ValueError(
+                F"Expected blocks of 8 bytes, received {len(data)}: {bytes(data).hex().upper()}")
 
-    block_64 = R_32 + L_32
+        return _pack_blocks(map(self._cipher(decrypt=decrypt, engine=engine), _unpack_blocks(data)))
 
-    #
-    # DES encryption with key #1
-    #
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+class DesKey(DeaKey):
+    """DesKey: single DES key (16 round keys)
+    """
 
-    for roundkey1 in roundkeys1:
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
+    def __init__(self, key_8B: ByteString | bytes):
+        self._key = check_length(key_8B, 8)
 
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
+        roundkeys = _table_roundkeys(int.from_bytes(self._key, 'big'))
+        self._encryption = [roundkeys]
+        self._decryption = [roundkeys[::-1]]
+        self._encryption_passes = [(self._key, False)]
+        self._decryption_passes = [(self._key, True)]
 
-    return block_64.byte_string
+    def mac(self, block_8B_n: ByteString, iv: ByteString = ByteString('00' * 8)) -> ByteString:
+        """mac(): ISO/IEC 9797-1 MAC algorithm 1 (CBC-MAC)
+        """
+        mac = Mac1(self, iv=iv)
+        mac.update(check_blocks(block_8B_n))
+        return mac.digest()
 
 
-def tdea_2_ded(key_16B: ByteString, block_8B: ByteString) -> ByteString:
-    """tdea_2_ded: Triple DES decryption algorithm
+class TdesKey(DeaKey):
+    """TdesKey: double or triple length DES key (32 or 48 round keys)
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
 
-    #
-    # DES decryption with key #1
-    #
+    def __init__(self, key: ByteString | bytes):
+        self._key = to_bytes(key)
+        if len(self._key) not in (16, 24):
+            raise ValueError(
+                F"Expected 16 or 24 bytes, received {len(self._key)}: {key}")
+
+        self._components = [DesKey(self._key[i:i+8])
+                            for i in range(0, len(self._key), 8)]
+        key_1, key_2 = self._components[0:2]
+        key_3 = self._components[2] if len(self._components) == 3 else key_1
+
+        # EDE for encryption, DED with the keys in reverse order for decryption
+        self._encryption = key_1._encryption + key_2._decryption + key_3._encryption
+        self._decryption = key_3._decryption + key_2._encryption + key_1._decryption
+        self._encryption_passes = key_1._encryption_passes + \
+            key_2._decryption_passes + key_3._encryption_passes
+        self._decryption_passes = key_3._decryption_passes + \
+            key_2._encryption_passes + key_1._decryption_passes
+
+    def mac(self, block_8B_n: ByteString, iv: ByteString = ByteString('00' * 8)) -> ByteString:
+        """mac(): ISO/IEC 9797-1 MAC algorithm 3 (retail MAC) with a double length key
+        """
+        mac = RetailMac(self, iv=iv)
+        mac.update(check_blocks(block_8B_n))
+        return mac.digest()
+
+
+class MacPadding(IntEnum):
+    """MacPadding: ISO/IEC 9797-1 padding methods
+    """
+    NoPadding = 0  # data must be a multiple of 8 bytes
+    Method1 = 1  # '00' bytes, at least one block
+    Method2 = 2  # '80' followed by '00' bytes
 
-    # converting the input from hexadecimal string to bit string
-    key_128 = key_16B.bit_string
-    key_64 = key_128[0:64]
-    block_64 = block_8B.bit_string
 
-    # pre-computing the 16 round keys
-    roundkeys1 = _roundkeys(key_64)
+class _CbcMac:
+    """_CbcMac: incremental CBC-MAC, the chaining value is kept as a 64-bit int
 
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
-
-    for roundkey1 in reversed(roundkeys1):
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
-
-    block_64 = R_32 + L_32
+    Complete blocks are chained as soon as they are received; only the last
+    partial block (less than 8 bytes) is kept until digest().
+    """
 
-    # DES encryption with key #2
+    def __init__(self, key: DesKey, iv: ByteString, padding: MacPadding):
+        self._cipher = key._cipher(decrypt=False)
+        self._chaining = int.from_bytes(check_length(iv, 8), 'big')
+        self._padding = MacPadding(padding)
+        self._pending = b''
+        self._length = 0
+
+    def update(self, data: ByteString | bytes) -> None:
+        """update(): adds 'data' to the message
+        """
+        data = self._pending + to_bytes(data)
+        self._length += len(data) - len(self._pending)
+
+        end = len(data) - len(data) % 8
+        chaining, cipher = self._chaining, self._cipher
+        for block in _unpack_blocks(data[:end]):
+            chaining = cipher(chaining ^ block)
+
+        self._chaining = chaining
+        self._pending = data[end:]
+
+    def digest(self) -> ByteString:
+        """digest(): MAC of the message so far, more data can still be added
+        """
+        chaining = self._chaining
+        for block in _unpack_blocks(self._padding_bytes()):
+            chaining = self._cipher(chaining ^ block)
+
+        return ByteString(self._output_transformation(chaining).to_bytes(8, 'big'))
+
+    def copy(self) -> '_CbcMac':
+        """copy(): independent copy of the current state, e.g. to MAC several messages sharing a prefix
+        """
+        return copy.copy(self)
+
+    def _padding_bytes(self) -> bytes:
+        match self._padding:
+            case MacPadding.NoPadding:
+                if self._length == 0:
+                    raise ValueError("Expected blocks of 8 bytes, received an empty message")
+                if self._pending:
+                    raise ValueError(
+                        F"Expected blocks of 8 bytes, received {self._length}: {ByteString(self._pending)}")
+                return b''
+
+            case MacPadding.Method1:
+                if self._pending or self._length == 0:
+                    return self._pending + bytes(8 - len(self._pending))
+                return b''
+
+            case MacPadding.Method2:
+                return self._pending + b'\x80' + bytes(7 - len(self._pending))
+
+    def _output_transformation(self, chaining: int) -> int:
+        return chaining
+
+
+class Mac1(_CbcMac):
+    """Mac1: ISO/IEC 9797-1 MAC algorithm 1 (CBC-MAC) with a single DES key
+    """
 
-    key_64 = key_128[64:128]
+    def __init__(self, key_8B: ByteString | DesKey, *, iv: ByteString = ByteString('00' * 8),
+                 padding: MacPadding = MacPadding.NoPadding):
+        super().__init__(_expand(key_8B, 8), iv, padding)
 
-    # pre-computing the 16 round keys
-    roundkeys2 = _roundkeys(key_64)
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+class RetailMac(_CbcMac):
+    """RetailMac: ISO/IEC 9797-1 MAC algorithm 3 (retail MAC) with a double length key
+    """
 
-    for roundkey2 in roundkeys2:
-        (L_32, R_32) = _round(roundkey2, L_32, R_32)
+    def __init__(self, key_16B: ByteString | TdesKey, *, iv: ByteString = ByteString('00' * 8),
+                 padding: MacPadding = MacPadding.NoPadding):
+        if _key_length(key_16B) != 16:
+            raise ValueError(
+                F"Retail MAC requires a 16-byte key, received {_key_length(key_16B)} bytes")
 
-    block_64 = R_32 + L_32
+        key_1, key_2 = _expand(key_16B, 16)._components
+        super().__init__(key_1, iv, padding)
+        self._decrypt_2 = key_2._cipher(decrypt=True)
 
-    # DES decryption with key #1
+    def _output_transformation(self, chaining: int) -> int:
+        return self._cipher(self._decrypt_2(chaining))
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
 
-    for roundkey1 in reversed(roundkeys1):
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
+# Expanded keys used by the functional API below, keyed by the raw key bytes.
+# schedule_cache.clear() flushes the key material held by the cache.
+schedule_cache = LruCache(capacity=64)
 
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
 
-    return block_64.byte_string
+def expand_key(key: ByteString | DeaKey) -> DeaKey:
+    """expand_key(): DesKey or TdesKey for a 8, 16 or 24-byte key, taken from schedule_cache
+    """
+    return _expand(key, _key_length(key))
 
 
-def tdea_3_ede(key_24B: ByteString, block_8B: ByteString) -> ByteString:
-    """tdea_3_ede: Triple DES encryption algorithm
+def dea_e(key_8B: ByteString, block_8B: ByteString) -> ByteString:
+    """dea_e: DES encryption algorithm
     """
     # checking inputs
-    if len(key_24B) != 24:
-        raise ValueError(
-            F"Expected 24 bytes, received {len(key_24B)}: {key_24B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
-
-    # converting the input from hexadecimal string to bit string
-    key_64_1 = key_24B[0:8].bit_string
-    key_64_2 = key_24B[8:16].bit_string
-    key_64_3 = key_24B[16:24].bit_string
-    block_64 = block_8B.bit_string
+    key = _expand(key_8B, 8)
+    block = check_length(block_8B, 8)
 
-    #
-    # DES encryption with key #1
-    #
+    return ByteString(key.encrypt_block(block))
 
-    # pre-computing the 16 round keys
-    roundkeys1 = _roundkeys(key_64_1)
 
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
-
-    for roundkey1 in roundkeys1:
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
+def dea_d(key_8B: ByteString, block_8B: ByteString) -> ByteString:
+    """dea_d: DES decryption algorithm
+    """
+    # checking inputs
+    key = _expand(key_8B, 8)
+    block = check_length(block_8B, 8)
 
-    block_64 = R_32 + L_32
+    return ByteString(key.decrypt_block(block))
 
-    #
-    # DES decryption with key #2
-    #
 
-    # pre-computing the 16 round keys
-    roundkeys2 = _roundkeys(key_64_2)
+def dea_ede_cbc(key_8B: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
+    """dea_ede_cbc: Single DES encryption algorithm in CBC mode
+    """
+    return _expand(key_8B, 8).cbc_encrypt(block_8B_n, iv_8B)
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
 
-    for roundkey2 in reversed(roundkeys2):
-        (L_32, R_32) = _round(roundkey2, L_32, R_32)
+def tdea_2_ede(key_16B: ByteString, block_8B: ByteString) -> ByteString:
+    """tdea_2_ede: Triple DES encryption algorithm
+    """
+    # checking inputs
+    key = _expand(key_16B, 16)
+    block = check_length(block_8B, 8)
 
-    block_64 = R_32 + L_32
+    return ByteString(key.encrypt_block(block))
 
-    #
-    # DES encryption with key #3
-    #
 
-    # pre-computing the 16 round keys
-    roundkeys3 = _roundkeys(key_64_3)
+def tdea_2_ded(key_16B: ByteString, block_8B: ByteString) -> ByteString:
+    """tdea_2_ded: Triple DES decryption algorithm
+    """
+    # checking inputs
+    key = _expand(key_16B, 16)
+    block = check_length(block_8B, 8)
 
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
+    return ByteString(key.decrypt_block(block))
 
-    for roundkey3 in roundkeys3:
-        (L_32, R_32) = _round(roundkey3, L_32, R_32)
 
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
+def tdea_3_ede(key_24B: ByteString, block_8B: ByteString) -> ByteString:
+    """tdea_3_ede: Triple DES encryption algorithm
+    """
+    # checking inputs
+    key = _expand(key_24B, 24)
+    block = check_length(block_8B, 8)
 
-    return block_64.byte_string
+    return ByteString(key.encrypt_block(block))
 
 
 def tdea_3_ded(key_24B: ByteString, block_8B: ByteString) -> ByteString:
     """tdea_3_ded: Triple DES decryption algorithm
     """
     # checking inputs
-    if len(key_24B) != 24:
-        raise ValueError(
-            F"Expected 24 bytes, received {len(key_24B)}: {key_24B}")
-    if len(block_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(block_8B)}: {block_8B}")
-
-    # converting the input from hexadecimal string to bit string
-    key_64_1 = key_24B[0:8].bit_string
-    key_64_2 = key_24B[8:16].bit_string
-    key_64_3 = key_24B[16:24].bit_string
-    block_64 = block_8B.bit_string
+    key = _expand(key_24B, 24)
+    block = check_length(block_8B, 8)
 
-    #
-    # DES decryption with key #3
-    #
-
-    # pre-computing the 16 round keys
-    roundkeys3 = _roundkeys(key_64_3)
-
-    # computing the 16 rounds
-    # applying initial permutation
-    block_64 = block_64.permute(_IP)
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
-
-    for roundkey3 in reversed(roundkeys3):
-        (L_32, R_32) = _round(roundkey3, L_32, R_32)
-
-    block_64 = R_32 + L_32
-
-    #
-    # DES encryption with key #2
-    #
-
-    # pre-computing the 16 round keys
-    roundkeys2 = _roundkeys(key_64_2)
-
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
-
-    for roundkey2 in roundkeys2:
-        (L_32, R_32) = _round(roundkey2, L_32, R_32)
-
-    block_64 = R_32 + L_32
-
-    #
-    # DES decryption with key #1
-    #
-
-    # pre-computing the 16 round keys
-    roundkeys1 = _roundkeys(key_64_1)
-
-    # computing the 16 rounds
-    # working on block halves of 32 bits
-    L_32 = block_64[0:32]
-    R_32 = block_64[32:64]
-
-    for roundkey1 in reversed(roundkeys1):
-        (L_32, R_32) = _round(roundkey1, L_32, R_32)
-
-    # applying the inversed initial permutation
-    block_64 = (R_32 + L_32).permute(_IPINV)
-    assert len(block_64) == 64
-
-    return block_64.byte_string
+    return ByteString(key.decrypt_block(block))
 
 
 def tdea_2_ede_ecb(key_16B: ByteString, block_8B_n: ByteString) -> ByteString:
     """tdea_2_ede_ecb: Triple DES encryption algorithm in ECB mnode
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    return modes.ecb_encryption(tdea_2_ede, key_16B, block_8B_n.blocks(8))
+    return _expand(key_16B, 16).ecb_encrypt(block_8B_n)
 
 
 def tdea_2_ded_ecb(key_16B: ByteString, block_8B_n: ByteString) -> ByteString:
     """tdea_2_ded_ecb: Triple DES decryption algorithm in ECB mode
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    return modes.ecb_decryption(tdea_2_ded, key_16B, block_8B_n.blocks(8))
+    return _expand(key_16B, 16).ecb_decrypt(block_8B_n)
 
 
 def tdea_2_ede_cbc(key_16B: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
     """tdea_2_ede_cbc: Triple DES encryption algorithm in CBC mnode
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-    if len(iv_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(iv_8B)}: {iv_8B}")
-
-    return modes.cbc_encryption(tdea_2_ede, key_16B, block_8B_n.blocks(8), iv_8B)
+    return _expand(key_16B, 16).cbc_encrypt(block_8B_n, iv_8B)
 
 
 def tdea_2_ded_cbc(key_16B: ByteString, block_8B_n: ByteString, iv_8B: ByteString) -> ByteString:
     """tdea_2_ded_cbc: Triple DES decryption algorithm in CBC mnode
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-    if len(iv_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(iv_8B)}: {iv_8B}")
-
-    return modes.cbc_decryption(tdea_2_ded, key_16B, block_8B_n.blocks(8), iv_8B)
+    return _expand(key_16B, 16).cbc_decrypt(block_8B_n, iv_8B)
 
 
 def tdea_3_ede_ecb(key_24B: ByteString, block_8B_n: ByteString) -> ByteString:
     """tdea_3_ede_ecb: Triple DES encryption algorithm in ECB mnode
     """
-    # checking inputs
-    if len(key_24B) != 24:
-        raise ValueError(
-            F"Expected 24 bytes, received {len(key_24B)}: {key_24B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    return modes.ecb_encryption(tdea_3_ede, key_24B, block_8B_n.blocks(8))
+    return _expand(key_24B, 24).ecb_encrypt(block_8B_n)
 
 
 def tdea_3_ded_ecb(key_24B: ByteString, block_8B_n: ByteString) -> ByteString:
     """tdea_3_ded_ecb: Triple DES decryption algorithm in ECB mode
     """
-    # checking inputs
-    if len(key_24B) != 24:
-        raise ValueError(
-            F"Expected 24 bytes, received {len(key_24B)}: {key_24B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    return modes.ecb_decryption(tdea_3_ded, key_24B, block_8B_n.blocks(8))
+    return _expand(key_24B, 24).ecb_decrypt(block_8B_n)
 
 
 def encrypt(key: ByteString, block_8B: ByteString) -> ByteString:
     """encrypt(): Single or triple-DES encryption
     """
-    match len(key):
+    match _key_length(key):
         case 8:
             return dea_e(key, block_8B)
 
@@ -529,7 +447,7 @@ def encrypt(key: ByteString, block_8B: ByteString) -> ByteString:
 def decrypt(key: ByteString, block_8B: ByteString) -> ByteString:
     """decrypt(): Single or triple-DES decryption
     """
-    match len(key):
+    match _key_length(key):
         case 8:
             return dea_d(key, block_8B)
 
@@ -549,53 +467,31 @@ def key_check_value(key: ByteString, *, len=3) -> ByteString:
 def mac_1_e(key_8B: ByteString, block_8B_n: ByteString, iv: ByteString = ByteString('00' * 8)) -> ByteString:
     """mac_1_e(): single DES MAC generation
     """
-    # checking inputs
-    if len(key_8B) != 8:
-        raise ValueError(
-            F"Expected 8 bytes, received {len(key_8B)}: {key_8B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    temp = iv
-    for block in block_8B_n.blocks(8):
-        temp = dea_e(key_8B, temp ^ block)
-
-    return temp
+    return _expand(key_8B, 8).mac(block_8B_n, iv=iv)
 
 
 def mac_2_ede(key_16B: ByteString, block_8B_n: ByteString, iv: ByteString = ByteString('00' * 8)) -> ByteString:
     """mac_2_ede(): double DES MAC generation
     """
-    # checking inputs
-    if len(key_16B) != 16:
-        raise ValueError(
-            F"Expected 16 bytes, received {len(key_16B)}: {key_16B}")
-    if (len(block_8B_n) % 8) != 0:
-        raise ValueError(
-            F"Expected blocks of 8 bytes, received {len(block_8B_n)}: {block_8B_n}")
-
-    key__key_1 = key_16B[0:8]
-    key__key_2 = key_16B[8:16]
-
-    mac = mac_1_e(key__key_1, block_8B_n, iv=iv)
-    mac = dea_d(key__key_2, mac)
-    mac = dea_e(key__key_1, mac)
-
-    return mac
+    return _expand(key_16B, 16).mac(block_8B_n, iv=iv)
 
 
 def adjust_parity(key: ByteString) -> ByteString:
     """
     """
-    match len(key):
+    key_bytes = to_bytes(key)
+    match len(key_bytes):
         case 8 | 16:
-            adjusted_parity = (_adjust_parity_byte(b) for b in key)
-
-            return reduce(__add__, adjusted_parity)
+            return ByteString(adjust_parity_bytes(key_bytes))
 
         case _:
-            raise ValueError(F"Key length not supported: {len(key)}")
+            raise ValueError(F"Key length not supported: {len(key_bytes)}")
+
+
+def adjust_parity_bytes(key: bytes) -> bytes:
+    """adjust_parity_bytes(): odd parity on each byte of 'key', of any length, e.g. many keys at once
+    """
+    return key.translate(_ODD_PARITY)
 
 
 def combine_keys_xor(kcv: ByteString, components: list[tuple[ByteString, ByteString]]) -> ByteString:
@@ -624,6 +520,67 @@ def combine_keys_xor(kcv: ByteString, components: list[tuple[ByteString, ByteStr
         return combined_key
 
 
+def encrypt_batch(keys: ByteString | Sequence[ByteString], blocks: Sequence[ByteString], *, lanes: int = 4096) -> list[bytes]:
+    """encrypt_batch(): single or triple DES encryption of many independent blocks
+
+    'keys' is either one key shared by all blocks, or one key per block (all of
+    the same length). Blocks are processed 'lanes' at a time with a bitsliced DEA,
+    results are returned in input order.
+    """
+    return _bitsliced_batch(keys, blocks, decrypt=False, lanes=lanes)
+
+
+def decrypt_batch(keys: ByteString | Sequence[ByteString], blocks: Sequence[ByteString], *, lanes: int = 4096) -> list[bytes]:
+    """decrypt_batch(): single or triple DES decryption of many independent blocks
+    """
+    return _bitsliced_batch(keys, blocks, decrypt=True, lanes=lanes)
+
+
+#
+# Input conversions, shared with crypto.backend and its engines
+#
+def to_bytes(value: ByteString | HexString | str | bytes) -> bytes:
+    """to_bytes(): 'value' as bytes, hexadecimal strings being decoded
+    """
+    match value:
+        case ByteString():
+            return value.bytes
+
+        case HexString():
+            return value.bytestring.bytes
+
+        case bytes() | bytearray() | memoryview():
+            return bytes(value)
+
+        case str():
+            return ByteString(value).bytes
+
+        case _:
+            raise TypeError(F"Unsupported input type: {type(value)}")
+
+
+def check_length(value: ByteString, nr_bytes: int) -> bytes:
+    """check_length(): 'value' as bytes, checked to be 'nr_bytes' long
+    """
+    value_bytes = to_bytes(value)
+    if len(value_bytes) != nr_bytes:
+        raise ValueError(
+            F"Expected {nr_bytes} bytes, received {len(value_bytes)}: {value}")
+
+    return value_bytes
+
+
+def check_blocks(value: ByteString) -> bytes:
+    """check_blocks(): 'value' as bytes, checked to be a whole number of 8-byte blocks
+    """
+    value_bytes = to_bytes(value)
+    if (len(value_bytes) % 8) != 0:
+        raise ValueError(
+            F"Expected blocks of 8 bytes, received {len(value_bytes)}: {value}")
+
+    return value_bytes
+
+
 #
 # DEA inner functions
 #
@@ -668,10 +625,301 @@ def _f(roundkey_48: BitString, block_32: BitString) -> BitString:
 
 
 #
-# helper functions
+# Table-driven DEA inner functions
+#
+def _compile_sp(box: int) -> list[int]:
+    """_compile_sp(): S-box 'box' combined with the permutation P
+    """
+    return [permute(int(_S[box][F"{value:06b}"], 2) << (28 - 4 * box), _P_T) for value in range(64)]
+
+
+# IP_TABLES, IPINV_TABLES and SP_TABLES are also used by crypto.des_numpy
+IP_TABLES = compile_permutation(_IP, 64).tables
+IPINV_TABLES = compile_permutation(_IPINV, 64).tables
+_PC1_T = compile_permutation(_PC1, 64).tables
+_PC2_T = compile_permutation(_PC2, 56).tables
+_P_T = compile_permutation(_P, 32).tables
+SP_TABLES = [_compile_sp(box) for box in range(8)]
+
+
+def _table_roundkeys(rootkey_64: int) -> tuple[tuple[int, ...], ...]:
+    roundkeys_16_8: list[tuple[int, ...]] = []
+
+    # applying permutation _PC1
+    T_56 = permute(rootkey_64, _PC1_T)
+    # working on key halves of 28 bits
+    C_28 = T_56 >> 28
+    D_28 = T_56 & 0x0FFFFFFF
+
+    # computing the 16 roundkeys, split in 8 6-bit S-box inputs
+    for shift in _shifts:
+        C_28 = rotate_left(C_28, shift, 28)
+        D_28 = rotate_left(D_28, shift, 28)
+        K_48 = permute((C_28 << 28) | D_28, _PC2_T)
+        roundkeys_16_8.append(tuple((K_48 >> (42 - 6 * i)) & 0x3F for i in range(8)))
+
+    return tuple(roundkeys_16_8)
+
+
+def _table_rounds(L_32: int, R_32: int, roundkeys: tuple[tuple[int, ...], ...]) -> tuple[int, int]:
+    S1, S2, S3, S4, S5, S6, S7, S8 = SP_TABLES
+
+    for k1, k2, k3, k4, k5, k6, k7, k8 in roundkeys:
+        # 34-bit rotation of R so that each 6-bit group of the expansion E is a contiguous slice
+        X_34 = ((R_32 & 1) << 33) | (R_32 << 1) | (R_32 >> 31)
+        L_32, R_32 = R_32, L_32 ^ (S1[((X_34 >> 28) & 0x3F) ^ k1] | S2[((X_34 >> 24) & 0x3F) ^ k2] |
+                                   S3[((X_34 >> 20) & 0x3F) ^ k3] | S4[((X_34 >> 16) & 0x3F) ^ k4] |
+                                   S5[((X_34 >> 12) & 0x3F) ^ k5] | S6[((X_34 >> 8) & 0x3F) ^ k6] |
+                                   S7[((X_34 >> 4) & 0x3F) ^ k7] | S8[(X_34 & 0x3F) ^ k8])
+
+    return R_32, L_32
+
+
+def _table_block(block_64: int, schedules: list[tuple[tuple[int, ...], ...]]) -> int:
+    # applying initial permutation
+    block_64 = permute(block_64, IP_TABLES)
+    # working on block halves of 32 bits
+    L_32 = block_64 >> 32
+    R_32 = block_64 & 0xFFFFFFFF
+
+    for roundkeys in schedules:
+        (L_32, R_32) = _table_rounds(L_32, R_32, roundkeys)
+
+    # applying the inversed initial permutation
+    return permute((L_32 << 32) | R_32, IPINV_TABLES)
+
+
+#
+# Reference DEA implementation
+#
+def _bitstring_crypt(passes: list[tuple[bytes, bool]], block: bytes) -> bytes:
+    # applying initial permutation
+    block_64 = BitString(block).permute(_IP)
+
+    for key, decrypt in passes:
+        # pre-computing the 16 round keys
+        roundkeys = _roundkeys(BitString(key))
+
+        # working on block halves of 32 bits
+        L_32 = block_64[0:32]
+        R_32 = block_64[32:64]
+
+        for roundkey in (reversed(roundkeys) if decrypt else roundkeys):
+            (L_32, R_32) = _round(roundkey, L_32, R_32)
+
+        block_64 = R_32 + L_32
+
+    # applying the inversed initial permutation
+    block_64 = block_64.permute(_IPINV)
+    assert len(block_64) == 64
+
+    return block_64.byte_string.bytes
+
+
+#
+# Bitsliced DEA inner functions
 #
-def _adjust_parity_byte(byte: ByteString) -> ByteString:
-    if byte.bit_string.count('1') % 2 == 0:
-        return byte ^ ByteString('01')
+# Each 'vector' is an integer holding the same bit of every block in the batch,
+# the first block of the batch being the most significant bit. Permutations are
+# then a re-ordering of the vectors and the S-boxes are evaluated with AND/OR/XOR.
+def _compile_key_schedule() -> list[list[int]]:
+    """_compile_key_schedule(): for each round, the key bit (0-based) used by each roundkey bit
+    """
+    T_56 = [i - 1 for i in _PC1]
+    C_28 = T_56[0:28]
+    D_28 = T_56[28:56]
+
+    schedule: list[list[int]] = []
+    for shift in _shifts:
+        C_28 = C_28[shift:] + C_28[:shift]
+        D_28 = D_28[shift:] + D_28[:shift]
+        schedule.append([(C_28 + D_28)[i - 1] for i in _PC2])
+
+    return schedule
+
+
+def _compile_sbox_columns(box: int) -> list[list[Callable]]:
+    """_compile_sbox_columns(): for each output bit and each row, getter of the columns where that bit is set
+    """
+    columns = [[[] for _ in range(4)] for _ in range(4)]
+    for value in range(64):
+        row = ((value >> 4) & 0x2) | (value & 0x1)
+        column = (value >> 1) & 0xF
+        output = int(_S[box][F"{value:06b}"], 2)
+        for bit in range(4):
+            if (output >> (3 - bit)) & 1:
+                columns[bit][row].append(column)
+
+    return [[itemgetter(*row_columns) for row_columns in bit_columns] for bit_columns in columns]
+
+
+_KS_I = _compile_key_schedule()
+_SBOX_COLUMNS = [_compile_sbox_columns(box) for box in range(8)]
+_E_I = [i - 1 for i in _E]
+_P_I = [i - 1 for i in _P]
+_IP_I = [i - 1 for i in _IP]
+_IPINV_I = [i - 1 for i in _IPINV]
+_BIT_TO_ASCII = [bytes(0x31 if (value >> (7 - bit)) & 1 else 0x30 for value in range(256))
+                 for bit in range(8)]
+_ASCII_TO_BIT = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _bitslice(data: bytes, width: int) -> list[int]:
+    """_bitslice(): 8*width vectors from the concatenation of 'width'-byte blocks
+    """
+    vectors: list[int] = []
+    for byte_index in range(width):
+        column = data[byte_index::width]
+        for bit in range(8):
+            vectors.append(int(column.translate(_BIT_TO_ASCII[bit]), 2))
+
+    return vectors
+
+
+def _unbitslice(vectors: list[int], nr_lanes: int) -> bytes:
+    """_unbitslice(): concatenation of 8-byte blocks from 64 vectors
+    """
+    data = bytearray(8 * nr_lanes)
+    for byte_index in range(8):
+        column = 0
+        for bit in range(8):
+            # each lane becomes one base-256 digit equal to 0 or 1
+            digits = F"{vectors[8 * byte_index + bit]:0{nr_lanes}b}".encode().translate(_ASCII_TO_BIT)
+            column |= int.from_bytes(digits, 'big') << (7 - bit)
+        data[byte_index::8] = column.to_bytes(nr_lanes, 'big')
+
+    return bytes(data)
+
+
+def _bitsliced_sbox(box: int, x: list[int], ones: int) -> list[int]:
+    b1, b2, b3, b4, b5, b6 = x
+    n1, n2, n3, n4, n5, n6 = b1 ^ ones, b2 ^ ones, b3 ^ ones, b4 ^ ones, b5 ^ ones, b6 ^ ones
+
+    # minterms of the column (b2 b3 b4 b5) and of the row (b1 b6)
+    b23 = (n2 & n3, n2 & b3, b2 & n3, b2 & b3)
+    b45 = (n4 & n5, n4 & b5, b4 & n5, b4 & b5)
+    columns = [m23 & m45 for m23 in b23 for m45 in b45]
+    rows = (n1 & n6, n1 & b6, b1 & n6, b1 & b6)
+
+    output: list[int] = []
+    for row_getters in _SBOX_COLUMNS[box]:
+        bit = 0
+        for row, getter in zip(rows, row_getters):
+            bit |= row & reduce(__or__, getter(columns))
+        output.append(bit)
+
+    return output
+
+
+def _bitsliced_rounds(L_32: list[int], R_32: list[int], roundkeys: list[list[int]], ones: int) -> tuple[list[int], list[int]]:
+    for roundkey_48 in roundkeys:
+        X_48 = [R_32[i] ^ k for i, k in zip(_E_I, roundkey_48)]
+
+        S_32: list[int] = []
+        for box in range(8):
+            S_32.extend(_bitsliced_sbox(box, X_48[6*box:6*box+6], ones))
+
+        L_32, R_32 = R_32, [l ^ S_32[i] for l, i in zip(L_32, _P_I)]
+
+    return R_32, L_32
+
+
+def _bitsliced_crypt(block_vectors: list[int], passes: list[tuple[list[int], bool]], ones: int) -> list[int]:
+    # applying initial permutation
+    block_64 = [block_vectors[i] for i in _IP_I]
+    L_32 = block_64[0:32]
+    R_32 = block_64[32:64]
+
+    for key_vectors, decrypt in passes:
+        roundkeys = [[key_vectors[i] for i in roundkey] for roundkey in _KS_I]
+        if decrypt:
+            roundkeys.reverse()
+        (L_32, R_32) = _bitsliced_rounds(L_32, R_32, roundkeys, ones)
+
+    # applying the inversed initial permutation
+    block_64 = L_32 + R_32
+    return [block_64[i] for i in _IPINV_I]
+
+
+def _bitsliced_batch(keys: ByteString | Sequence[ByteString], blocks: Sequence[ByteString], *, decrypt: bool, lanes: int) -> list[bytes]:
+    if lanes < 1:
+        raise ValueError(F"Expected at least 1 lane, received {lanes}")
+
+    data = b''.join(check_length(block, 8) for block in blocks)
+    nr_blocks = len(data) // 8
+
+    shared_key = isinstance(keys, (HexString, str, bytes, bytearray, memoryview, DeaKey))
+    if shared_key:
+        key_data = keys._key if isinstance(keys, DeaKey) else to_bytes(keys)
+        key_length = len(key_data)
     else:
-        return byte
+        key_list = [to_bytes(key) for key in keys]
+        if len(key_list) != nr_blocks:
+            raise ValueError(
+                F"Expected one key per block, received {len(key_list)} keys for {nr_blocks} blocks")
+        key_length = len(key_list[0]) if key_list else 8
+        if any(len(key) != key_length for key in key_list):
+            raise ValueError("Keys of a batch should all have the same length")
+        key_data = b''.join(key_list)
+
+    if key_length not in (8, 16, 24):
+        raise ValueError(F"Key length not supported: {key_length}")
+
+    results = bytearray()
+    for start in range(0, nr_blocks, lanes):
+        nr_lanes = min(lanes, nr_blocks - start)
+        ones = (1 << nr_lanes) - 1
+
+        if shared_key:
+            key_bits = int.from_bytes(key_data, 'big')
+            key_vectors = [ones if (key_bits >> (8 * key_length - 1 - i)) & 1 else 0
+                           for i in range(8 * key_length)]
+        else:
+            key_vectors = _bitslice(key_data[start * key_length:(start + nr_lanes) * key_length], key_length)
+
+        components = [key_vectors[i:i+64] for i in range(0, len(key_vectors), 64)]
+        if len(components) == 1:
+            passes = [(components[0], decrypt)]
+        else:
+            key_1, key_2 = components[0:2]
+            key_3 = components[2] if len(components) == 3 else key_1
+            passes = [(key_1, False), (key_2, True), (key_3, False)]
+            if decrypt:
+                passes = [(key, not direction) for key, direction in reversed(passes)]
+
+        block_vectors = _bitslice(data[8 * start:8 * (start + nr_lanes)], 8)
+        results += _unbitslice(_bitsliced_crypt(block_vectors, passes, ones), nr_lanes)
+
+    return [bytes(results[i:i+8]) for i in range(0, len(results), 8)]
+
+
+#
+# helper functions
+#
+def _expand(key: ByteString | DeaKey, nr_bytes: int) -> DeaKey:
+    if isinstance(key, DeaKey):
+        if len(key) != nr_bytes:
+            raise ValueError(
+                F"Expected {nr_bytes} bytes, received {len(key)}: {type(key).__name__}")
+        return key
+
+    key_bytes = check_length(key, nr_bytes)
+    return schedule_cache.get_or_create(key_bytes,
+                                        lambda: DesKey(key_bytes) if nr_bytes == 8 else TdesKey(key_bytes))
+
+
+def _key_length(key: ByteString | DeaKey) -> int:
+    return len(key) if isinstance(key, DeaKey) else len(to_bytes(key))
+
+
+def _unpack_blocks(data: bytes) -> tuple[int, ...]:
+    return struct.unpack(F">{len(data) // 8}Q", data)
+
+
+def _pack_blocks(blocks: Iterable[int]) -> bytes:
+    blocks = tuple(blocks)
+    return struct.pack(F">{len(blocks)}Q", *blocks)
+
+
+# bytes.translate() table setting the least significant bit of each byte for odd parity
+_ODD_PARITY = bytes(byte ^ (bin(byte).count('1') % 2 == 0) for byte in range(256))
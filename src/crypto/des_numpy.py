@@ -0,0 +1,146 @@
+"""des_numpy.py: DES and triple DES over NumPy arrays of 64-bit blocks
+
+Optional backend, only usable when NumPy is installed (see 'available()').
+Every DEA round is applied to a whole uint64 array at once with vectorized
+lookups in the same IP/SP tables as the table-driven engine of crypto.des.
+"""
+
+# Standard library imports
+
+# Third party imports
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, see available()
+    np = None
+
+# Local application imports
+from common.binary import ByteString
+from crypto.des import DeaKey, expand_key, IP_TABLES, IPINV_TABLES, SP_TABLES
+
+
+# Number of blocks processed at once, bounds the size of the temporary arrays
+CHUNK_BLOCKS = 1 << 16
+
+if np is not None:
+    _IP_A = np.array(IP_TABLES, dtype=np.uint64)
+    _IPINV_A = np.array(IPINV_TABLES, dtype=np.uint64)
+    _SP_A = np.array(SP_TABLES, dtype=np.uint64)
+
+
+def available() -> bool:
+    """available(): True when NumPy could be imported
+    """
+    return np is not None
+
+
+def encrypt_array(key: ByteString | DeaKey, blocks: 'np.ndarray') -> 'np.ndarray':
+    """encrypt_array(): single or triple DES encryption of an array of uint64 blocks
+    """
+    return _crypt_array(expand_key(key).roundkeys(decrypt=False), blocks)
+
+
+def decrypt_array(key: ByteString | DeaKey, blocks: 'np.ndarray') -> 'np.ndarray':
+    """decrypt_array(): single or triple DES decryption of an array of uint64 blocks
+    """
+    return _crypt_array(expand_key(key).roundkeys(decrypt=True), blocks)
+
+
+def ecb_encrypt(key: ByteString | DeaKey, data: bytes) -> bytes:
+    """ecb_encrypt(): single or triple DES encryption in ECB mode
+    """
+    return _crypt_bytes(expand_key(key).roundkeys(decrypt=False), data)
+
+
+def ecb_decrypt(key: ByteString | DeaKey, data: bytes) -> bytes:
+    """ecb_decrypt(): single or triple DES decryption in ECB mode
+    """
+    return _crypt_bytes(expand_key(key).roundkeys(decrypt=True), data)
+
+
+# 'NumpyDeaKey' class
+class NumpyDeaKey:
+    """NumpyDeaKey: crypto.modes.BlockCipher running ECB over NumPy arrays
+
+    Can be passed as 'key' to crypto.modes.ecb_encryption()/ecb_decryption().
+    """
+    block_size = 8
+
+    def __init__(self, key: ByteString | DeaKey):
+        _require_numpy()
+        self._key = expand_key(key)
+
+    def __len__(self) -> int:
+        return len(self._key)
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        return self._key.encrypt_block(block)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        return self._key.decrypt_block(block)
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        return _crypt_bytes(self._key.roundkeys(decrypt=False), data)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        return _crypt_bytes(self._key.roundkeys(decrypt=True), data)
+
+
+#
+# helper functions
+#
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy is required by crypto.des_numpy")
+
+
+def _crypt_bytes(schedules: list[tuple[tuple[int, ...], ...]], data: bytes) -> bytes:
+    if (len(data) % 8) != 0:
+        raise ValueError(
+            F"Expected blocks of 8 bytes, received {len(data)}")
+    _require_numpy()
+
+    blocks = np.frombuffer(data, dtype='>u8').astype(np.uint64)
+    return _crypt_array(schedules, blocks).astype('>u8').tobytes()
+
+
+def _crypt_array(schedules: list[tuple[tuple[int, ...], ...]], blocks: 'np.ndarray') -> 'np.ndarray':
+    _require_numpy()
+    blocks = np.asarray(blocks, dtype=np.uint64)
+    output = np.empty_like(blocks)
+
+    for start in range(0, len(blocks), CHUNK_BLOCKS):
+        output[start:start + CHUNK_BLOCKS] = _crypt_chunk(schedules, blocks[start:start + CHUNK_BLOCKS])
+
+    return output
+
+
+def _permute(blocks: 'np.ndarray', tables: 'np.ndarray') -> 'np.ndarray':
+    permuted = tables[0][blocks >> np.uint64(56)]
+    for byte_index in range(1, 8):
+        permuted |= tables[byte_index][(blocks >> np.uint64(56 - 8 * byte_index)) & np.uint64(0xFF)]
+
+    return permuted
+
+
+def _crypt_chunk(schedules: list[tuple[tuple[int, ...], ...]], blocks: 'np.ndarray') -> 'np.ndarray':
+    shifts = [np.uint64(shift) for shift in (28, 24, 20, 16, 12, 8, 4, 0)]
+    one, six_bits, mask_32 = np.uint64(1), np.uint64(0x3F), np.uint64(0xFFFFFFFF)
+
+    # applying initial permutation
+    blocks = _permute(blocks, _IP_A)
+    # working on block halves of 32 bits
+    L_32 = blocks >> np.uint64(32)
+    R_32 = blocks & mask_32
+
+    for roundkeys in schedules:
+        for roundkey in roundkeys:
+            # 34-bit rotation of R so that each 6-bit group of the expansion E is a contiguous slice
+            X_34 = ((R_32 & one) << np.uint64(33)) | (R_32 << one) | (R_32 >> np.uint64(31))
+            F_32 = _SP_A[0][((X_34 >> shifts[0]) & six_bits) ^ np.uint64(roundkey[0])]
+            for box in range(1, 8):
+                F_32 |= _SP_A[box][((X_34 >> shifts[box]) & six_bits) ^ np.uint64(roundkey[box])]
+            L_32, R_32 = R_32, L_32 ^ F_32
+        L_32, R_32 = R_32, L_32
+
+    # applying the inversed initial permutation
+    return _permute((L_32 << np.uint64(32)) | R_32, _IPINV_A)
@@ -2,9 +2,10 @@
 """
 
 # Standard library imports
-from typing import Callable, Iterable
-from functools import reduce
-from operator import __add__
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+import os
+from typing import BinaryIO, Callable, Iterable, Protocol, runtime_checkable
 
 # Third party imports
 
@@ -14,44 +15,505 @@ from common.binary import ByteString
 
 SymmetricCipher = Callable[[ByteString, ByteString], ByteString]
 
+# Number of counter blocks encrypted per call to BlockCipher.encrypt_blocks() in CTR mode
+CTR_BATCH_BLOCKS = 1 << 12
+# Minimum number of blocks before CTR mode and the parallel_* functions fan out to worker processes
+PARALLEL_MIN_BLOCKS = 1 << 16
+
+
+@runtime_checkable
+class BlockCipher(Protocol):
+    """BlockCipher: key object with a pre-computed key schedule (e.g. des.DesKey, des.TdesKey)
+
+    Can be passed as 'key' to the functions below, in which case the key schedule
+    is reused for all blocks and 'enc'/'dec' are not called.
+    """
+    block_size: int
+
+    def encrypt_block(self, block: bytes) -> bytes: ...
+
+    def decrypt_block(self, block: bytes) -> bytes: ...
+
+    def encrypt_blocks(self, data: bytes) -> bytes: ...
+
+    def decrypt_blocks(self, data: bytes) -> bytes: ...
+
 
 def ecb_encryption(enc: SymmetricCipher, key: ByteString, blocks: Iterable[ByteString]) -> ByteString:
     """ecb_encryption()
     """
+    if isinstance(key, BlockCipher):
+        return ByteString(key.encrypt_blocks(b''.join(block.bytes for block in blocks)))
+
     ciphertext_blocks = [enc(key, plaintext_block)
                          for plaintext_block in blocks]
 
-    return reduce(__add__, ciphertext_blocks)
+    return _join(ciphertext_blocks)
 
 
 def ecb_decryption(dec: SymmetricCipher, key: ByteString, blocks: Iterable[ByteString]) -> ByteString:
     """ecb_decryption()
     """
+    if isinstance(key, BlockCipher):
+        return ByteString(key.decrypt_blocks(b''.join(block.bytes for block in blocks)))
+
     plaintext_blocks = [dec(key, ciphertext_block)
                         for ciphertext_block in blocks]
 
-    return reduce(__add__, plaintext_blocks)
+    return _join(plaintext_blocks)
 
 
 def cbc_encryption(enc: SymmetricCipher, key: ByteString, blocks: Iterable[ByteString], iv: ByteString) -> ByteString:
     """cbc_encryption()
     """
+    if isinstance(key, BlockCipher):
+        enc = _block_function(key.encrypt_block)
+
     tmp = iv
     ciphertext_blocks: list[ByteString] = []
     for plaintext_block in blocks:
         tmp = enc(key, tmp ^ plaintext_block)
         ciphertext_blocks.append(tmp)
 
-    return reduce(__add__, ciphertext_blocks)
+    return _join(ciphertext_blocks)
 
 
 def cbc_decryption(dec: SymmetricCipher, key: ByteString, blocks: Iterable[ByteString], iv: ByteString) -> ByteString:
     """cbc_decryption()
     """
+    if isinstance(key, BlockCipher):
+        dec = _block_function(key.decrypt_block)
+
     tmp = iv
     plaintext_blocks: list[ByteString] = []
     for ciphertext_block in blocks:
         plaintext_blocks.append(tmp ^ dec(key, ciphertext_block))
         tmp = ciphertext_block
 
-    return reduce(__add__, plaintext_blocks)
+    return _join(plaintext_blocks)
+
+
+#
+# Streaming cipher contexts
+#
+class _CipherContext(ABC):
+    """_CipherContext: incremental encryption/decryption with a BlockCipher
+
+    update() accepts chunks of any size, complete blocks are processed at once and
+    the remaining bytes are kept until the next call. No padding is applied:
+    finalize() raises ValueError if the data was not a multiple of the block size.
+    """
+
+    def __init__(self, key: BlockCipher):
+        if not isinstance(key, BlockCipher):
+            raise TypeError(
+                F"Expected a BlockCipher key object, received: {type(key)}")
+
+        self._key = key
+        self.block_size = key.block_size
+        self._pending = bytearray()
+        self._finalized = False
+
+    def update(self, data: bytes | bytearray | memoryview | ByteString) -> bytes:
+        """update(): processes all complete blocks available, returns the output bytes
+        """
+        if self._finalized:
+            raise ValueError(
+                F"{type(self).__name__}: context already finalized")
+
+        self._pending += data.bytes if isinstance(data, ByteString) else data
+        end = len(self._pending) - len(self._pending) % self.block_size
+        if end == 0:
+            return b''
+
+        blocks = bytes(self._pending[:end])
+        del self._pending[:end]
+
+        return self._process(blocks)
+
+    def update_into(self, data: bytes | bytearray | memoryview | ByteString, buffer: bytearray | memoryview) -> int:
+        """update_into(): same as update() but writes into 'buffer', returns the number of bytes written
+
+        'buffer' must hold at least len(data) + block_size - 1 bytes.
+        """
+        if len(buffer) < len(data) + self.block_size - 1:
+            raise ValueError(
+                F"{type(self).__name__}: buffer should be at least {len(data) + self.block_size - 1} bytes, received {len(buffer)}")
+
+        output = self.update(data)
+        memoryview(buffer)[:len(output)] = output
+
+        return len(output)
+
+    def finalize(self) -> bytes:
+        """finalize(): ends the operation, no more data can be processed
+        """
+        if self._finalized:
+            raise ValueError(
+                F"{type(self).__name__}: context already finalized")
+
+        self._finalized = True
+        if self._pending:
+            raise ValueError(
+                F"{type(self).__name__}: expected blocks of {self.block_size} bytes, {len(self._pending)} bytes left")
+
+        return b''
+
+    @abstractmethod
+    def _process(self, blocks: bytes) -> bytes:
+        ...
+
+
+class EcbEncryptor(_CipherContext):
+    """EcbEncryptor: streaming encryption in ECB mode
+    """
+
+    def _process(self, blocks: bytes) -> bytes:
+        return self._key.encrypt_blocks(blocks)
+
+
+class EcbDecryptor(_CipherContext):
+    """EcbDecryptor: streaming decryption in ECB mode
+    """
+
+    def _process(self, blocks: bytes) -> bytes:
+        return self._key.decrypt_blocks(blocks)
+
+
+class CbcEncryptor(_CipherContext):
+    """CbcEncryptor: streaming encryption in CBC mode
+    """
+
+    def __init__(self, key: BlockCipher, iv: bytes | ByteString):
+        super().__init__(key)
+        self._chaining = _check_iv(iv, self.block_size)
+
+    def _process(self, blocks: bytes) -> bytes:
+        size = self.block_size
+        output = bytearray(len(blocks))
+        chaining = self._chaining
+        for i in range(0, len(blocks), size):
+            chaining = self._key.encrypt_block(_xor(chaining, blocks[i:i+size]))
+            output[i:i+size] = chaining
+
+        self._chaining = chaining
+        return bytes(output)
+
+
+class CbcDecryptor(_CipherContext):
+    """CbcDecryptor: streaming decryption in CBC mode
+    """
+
+    def __init__(self, key: BlockCipher, iv: bytes | ByteString):
+        super().__init__(key)
+        self._chaining = _check_iv(iv, self.block_size)
+
+    def _process(self, blocks: bytes) -> bytes:
+        # blocks don't depend on each other: all are decrypted at once, then XORed
+        # with the previous ciphertext blocks
+        output = _xor(self._key.decrypt_blocks(blocks), self._chaining + blocks[:-self.block_size])
+        self._chaining = blocks[-self.block_size:]
+
+        return output
+
+
+class _StreamCipherContext(_CipherContext):
+    """_StreamCipherContext: keystream modes, any number of bytes is processed immediately
+    """
+
+    def update(self, data: bytes | bytearray | memoryview | ByteString) -> bytes:
+        if self._finalized:
+            raise ValueError(
+                F"{type(self).__name__}: context already finalized")
+
+        data = data.bytes if isinstance(data, ByteString) else bytes(data)
+        return self._process(data) if data else b''
+
+
+class CtrCipher(_StreamCipherContext):
+    """CtrCipher: encryption and decryption in CTR mode (NIST SP 800-38A)
+
+    The counter block is incremented as a big-endian integer, modulo 2^(8*block_size).
+    Keystream is produced CTR_BATCH_BLOCKS counter blocks at a time through
+    BlockCipher.encrypt_blocks(); with 'workers' > 1, requests of at least
+    PARALLEL_MIN_BLOCKS blocks are split across a pool of processes ('key' must
+    then be picklable, e.g. des.DesKey/des.TdesKey). The pool is started by the
+    first such request and reused until finalize().
+    """
+
+    def __init__(self, key: BlockCipher, counter: bytes | ByteString, *, workers: int = 1):
+        super().__init__(key)
+        self._counter = int.from_bytes(_check_iv(counter, self.block_size), 'big')
+        self._workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._offset = 0
+
+    def keystream_at(self, offset: int, length: int) -> bytes:
+        """keystream_at(): 'length' keystream bytes starting at byte 'offset' of the stream
+        """
+        if offset < 0 or length < 0:
+            raise ValueError(
+                F"CtrCipher: offset and length should be positive, received {offset} and {length}")
+
+        first_block = offset // self.block_size
+        nr_blocks = -(-(offset + length) // self.block_size) - first_block
+        counter = self._counter + first_block
+        skip = offset % self.block_size
+
+        if self._workers > 1 and nr_blocks >= PARALLEL_MIN_BLOCKS:
+            if self._executor is None:
+                self._executor = _new_executor(self._key, self._workers)
+            chunks = _chunks(nr_blocks, self._workers)
+            keystream = b''.join(self._executor.map(_worker_ctr_keystream,
+                                                    [counter + start for start, _ in chunks],
+                                                    [end - start for start, end in chunks]))
+        else:
+            keystream = _ctr_keystream(self._key, counter, nr_blocks)
+
+        return keystream[skip:skip + length]
+
+    def finalize(self) -> bytes:
+        """finalize(): ends the operation and stops the worker processes, if any
+        """
+        try:
+            return super().finalize()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _process(self, data: bytes) -> bytes:
+        keystream = self.keystream_at(self._offset, len(data))
+        self._offset += len(data)
+
+        return _xor(data, keystream)
+
+
+class OfbCipher(_StreamCipherContext):
+    """OfbCipher: encryption and decryption in OFB mode
+    """
+
+    def __init__(self, key: BlockCipher, iv: bytes | ByteString):
+        super().__init__(key)
+        self._register = _check_iv(iv, self.block_size)
+        self._keystream = b''
+
+    def _process(self, data: bytes) -> bytes:
+        keystream = bytearray(self._keystream)
+        while len(keystream) < len(data):
+            self._register = self._key.encrypt_block(self._register)
+            keystream += self._register
+
+        self._keystream = bytes(keystream[len(data):])
+        return _xor(data, bytes(keystream[:len(data)]))
+
+
+class CfbEncryptor(_CipherContext):
+    """CfbEncryptor: streaming encryption in CFB mode, with a segment of one block
+
+    A final partial block is encrypted by finalize().
+    """
+
+    def __init__(self, key: BlockCipher, iv: bytes | ByteString):
+        super().__init__(key)
+        self._register = _check_iv(iv, self.block_size)
+
+    def finalize(self) -> bytes:
+        pending, self._pending = bytes(self._pending), bytearray()
+        super().finalize()
+
+        return _xor(pending, self._key.encrypt_block(self._register)[:len(pending)])
+
+    def _process(self, blocks: bytes) -> bytes:
+        size = self.block_size
+        output = bytearray(len(blocks))
+        register = self._register
+        for i in range(0, len(blocks), size):
+            register = _xor(self._key.encrypt_block(register), blocks[i:i+size])
+            output[i:i+size] = register
+
+        self._register = register
+        return bytes(output)
+
+
+class CfbDecryptor(_CipherContext):
+    """CfbDecryptor: streaming decryption in CFB mode, with a segment of one block
+
+    A final partial block is decrypted by finalize().
+    """
+
+    def __init__(self, key: BlockCipher, iv: bytes | ByteString):
+        super().__init__(key)
+        self._register = _check_iv(iv, self.block_size)
+
+    def finalize(self) -> bytes:
+        pending, self._pending = bytes(self._pending), bytearray()
+        super().finalize()
+
+        return _xor(pending, self._key.encrypt_block(self._register)[:len(pending)])
+
+    def _process(self, blocks: bytes) -> bytes:
+        # the cipher inputs are all known: they are encrypted at once
+        keystream = self._key.encrypt_blocks(self._register + blocks[:-self.block_size])
+        self._register = blocks[-self.block_size:]
+
+        return _xor(blocks, keystream)
+
+
+#
+# Parallel ECB and CBC decryption
+#
+def parallel_ecb_encrypt(key: BlockCipher, data: bytes | ByteString, *, workers: int | None = None) -> bytes:
+    """parallel_ecb_encrypt(): ECB encryption split across 'workers' processes (default: one per CPU)
+
+    Inputs shorter than PARALLEL_MIN_BLOCKS blocks are encrypted in this process.
+    'key' must be picklable, e.g. des.DesKey/des.TdesKey.
+    """
+    return _parallel(key, _check_data(data, key.block_size), workers, _worker_encrypt_blocks, key.encrypt_blocks)
+
+
+def parallel_ecb_decrypt(key: BlockCipher, data: bytes | ByteString, *, workers: int | None = None) -> bytes:
+    """parallel_ecb_decrypt(): ECB decryption split across 'workers' processes (default: one per CPU)
+    """
+    return _parallel(key, _check_data(data, key.block_size), workers, _worker_decrypt_blocks, key.decrypt_blocks)
+
+
+def parallel_cbc_decrypt(key: BlockCipher, data: bytes | ByteString, iv: bytes | ByteString, *, workers: int | None = None) -> bytes:
+    """parallel_cbc_decrypt(): CBC decryption split across 'workers' processes (default: one per CPU)
+
+    Each chunk is sent along with the ciphertext block preceding it.
+    """
+    size = key.block_size
+    data = _check_data(data, size)
+    if not data:
+        _check_iv(iv, size)
+        return b''
+    chained = _check_iv(iv, size) + data[:-size]
+
+    return _parallel(key, data, workers, _worker_cbc_decrypt, lambda data: _cbc_decrypt(key, data, chained),
+                     lambda start, end: (data[start:end], chained[start:end]))
+
+
+def crypt_stream(context: _CipherContext, source: BinaryIO, destination: BinaryIO, *, chunk_size: int = 1 << 20) -> int:
+    """crypt_stream(): runs 'source' through 'context' into 'destination' in constant memory
+
+    Returns the number of bytes written.
+    """
+    input_buffer = bytearray(chunk_size)
+    output_buffer = bytearray(chunk_size + context.block_size - 1)
+    input_view, output_view = memoryview(input_buffer), memoryview(output_buffer)
+
+    total = 0
+    while (nr_bytes := source.readinto(input_buffer)):
+        written = context.update_into(input_view[:nr_bytes], output_buffer)
+        destination.write(output_view[:written])
+        total += written
+
+    final = context.finalize()
+    destination.write(final)
+
+    return total + len(final)
+
+
+#
+# helper functions
+#
+def _block_function(crypt_block: Callable[[bytes], bytes]) -> SymmetricCipher:
+    return lambda _, block: ByteString(crypt_block(block.bytes))
+
+
+def _join(blocks: list[ByteString]) -> ByteString:
+    return ByteString(b''.join(block.bytes for block in blocks))
+
+
+def _check_iv(iv: bytes | ByteString, block_size: int) -> bytes:
+    iv = iv.bytes if isinstance(iv, ByteString) else bytes(iv)
+    if len(iv) != block_size:
+        raise ValueError(
+            F"Expected an IV of {block_size} bytes, received {len(iv)}: {iv.hex().upper()}")
+
+    return iv
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    return (int.from_bytes(left, 'big') ^ int.from_bytes(right, 'big')).to_bytes(len(left), 'big')
+
+
+def _ctr_keystream(key: BlockCipher, counter: int, nr_blocks: int) -> bytes:
+    size = key.block_size
+    mask = (1 << (8 * size)) - 1
+
+    keystream = bytearray()
+    for start in range(0, nr_blocks, CTR_BATCH_BLOCKS):
+        counter_blocks = b''.join(((counter + i) & mask).to_bytes(size, 'big')
+                                  for i in range(start, min(start + CTR_BATCH_BLOCKS, nr_blocks)))
+        keystream += key.encrypt_blocks(counter_blocks)
+
+    return bytes(keystream)
+
+
+def _cbc_decrypt(key: BlockCipher, data: bytes, chained: bytes) -> bytes:
+    return _xor(key.decrypt_blocks(data), chained)
+
+
+def _check_data(data: bytes | ByteString, block_size: int) -> bytes:
+    data = data.bytes if isinstance(data, ByteString) else bytes(data)
+    if (len(data) % block_size) != 0:
+        raise ValueError(
+            F"Expected blocks of {block_size} bytes, received {len(data)}")
+
+    return data
+
+
+def _chunks(nr_blocks: int, workers: int) -> list[tuple[int, int]]:
+    # a few chunks per worker, so that a slow worker doesn't hold the others back
+    chunk = -(-nr_blocks // (4 * workers))
+    return [(start, min(start + chunk, nr_blocks)) for start in range(0, nr_blocks, chunk)]
+
+
+def _parallel(key: BlockCipher, data: bytes, workers: int | None, worker_function: Callable,
+              serial_function: Callable[[bytes], bytes], arguments: Callable | None = None) -> bytes:
+    workers = workers or os.cpu_count() or 1
+    nr_blocks = len(data) // key.block_size
+    if workers == 1 or nr_blocks < PARALLEL_MIN_BLOCKS:
+        return serial_function(data)
+
+    size = key.block_size
+    arguments = arguments or (lambda start, end: (data[start:end],))
+    chunk_arguments = [arguments(start * size, end * size) for start, end in _chunks(nr_blocks, workers)]
+
+    return b''.join(_map_workers(key, workers, worker_function, *zip(*chunk_arguments)))
+
+
+def _map_workers(key: BlockCipher, workers: int, function: Callable, *iterables) -> list[bytes]:
+    with _new_executor(key, workers) as executor:
+        return list(executor.map(function, *iterables))
+
+
+def _new_executor(key: BlockCipher, workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(key,))
+
+
+# Key object of a worker process, set once by the pool initializer
+_worker_key: BlockCipher | None = None
+
+
+def _init_worker(key: BlockCipher) -> None:
+    global _worker_key
+    _worker_key = key
+
+
+def _worker_ctr_keystream(counter: int, nr_blocks: int) -> bytes:
+    return _ctr_keystream(_worker_key, counter, nr_blocks)
+
+
+def _worker_encrypt_blocks(data: bytes) -> bytes:
+    return _worker_key.encrypt_blocks(data)
+
+
+def _worker_decrypt_blocks(data: bytes) -> bytes:
+    return _worker_key.decrypt_blocks(data)
+
+
+def _worker_cbc_decrypt(data: bytes, chained: bytes) -> bytes:
+    return _cbc_decrypt(_worker_key, data, chained)
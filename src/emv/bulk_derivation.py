@@ -0,0 +1,156 @@
+"""bulk_derivation.py: ICC Master Key derivation (Option A) of PAN/PSN files
+
+Reads records with 'pan' and optional 'psn' fields from CSV (with a header line)
+or JSON lines, and writes the same records extended with a 'udk' field:
+
+    gep3-derive-udks --imk 0123...98 --workers 8 cards.csv udks.csv
+
+The IMK can also be passed through the GEP3_IMK environment variable, to keep it
+out of the process list. An interrupted run is resumed with --offset, using the
+value printed on exit; the output file is then appended to.
+"""
+
+# Standard library imports
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Iterator, TextIO
+
+# Third party imports
+
+# Local application imports
+from common.binary import ByteString
+from crypto import backend
+from emv.key_management import BATCH_SIZE, derive_udks
+
+
+IMK_ENVIRONMENT_VARIABLE = 'GEP3_IMK'
+
+
+def read_records(file: TextIO, format: str) -> Iterator[dict[str, str]]:
+    """read_records(): lazily parsed records of a CSV or JSON lines file
+    """
+    match format:
+        case 'csv':
+            yield from csv.DictReader(file)
+
+        case 'jsonl':
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+        case _:
+            raise ValueError(F"Unsupported format: {format}")
+
+
+def write_record(file: TextIO, format: str, record: dict[str, str], *, header: bool = False) -> None:
+    """write_record(): writes 'record' as a CSV line (preceded by a header line if 'header') or a JSON line
+    """
+    match format:
+        case 'csv':
+            writer = csv.DictWriter(file, fieldnames=list(record), lineterminator='\n')
+            if header:
+                writer.writeheader()
+            writer.writerow(record)
+
+        case 'jsonl':
+            file.write(json.dumps(record) + '\n')
+
+        case _:
+            raise ValueError(F"Unsupported format: {format}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """main(): console entry point, returns the process exit code
+    """
+    arguments = _parser().parse_args(argv)
+
+    imk = arguments.imk or os.environ.get(IMK_ENVIRONMENT_VARIABLE)
+    if not imk:
+        print(F"An IMK is required, through --imk or {IMK_ENVIRONMENT_VARIABLE}", file=sys.stderr)
+        return 2
+
+    if arguments.backend:
+        backend.select_backend(arguments.backend)
+
+    format = arguments.format or _format(arguments.input)
+    source = sys.stdin if arguments.input == '-' else open(arguments.input, newline='')
+    destination = sys.stdout if arguments.output == '-' else \
+        open(arguments.output, 'a' if arguments.offset else 'w', newline='')
+
+    records = itertools.islice(read_records(source, format), arguments.offset, None)
+    # one copy of the records for derive_udks(), one to write them back: tee() only
+    # buffers the records of the batches in flight
+    records, pairs = itertools.tee(records)
+    pairs = ((record['pan'], record.get('psn') or '00') for record in pairs)
+
+    start = last_report = time.monotonic()
+    count = 0
+    try:
+        for record, udk in zip(records, derive_udks(ByteString(imk), pairs, workers=arguments.workers,
+                                                    batch_size=arguments.batch_size)):
+            write_record(destination, format, {**record, 'udk': udk.hex().upper()},
+                         header=(count == 0 and arguments.offset == 0))
+            count += 1
+
+            if arguments.progress and time.monotonic() - last_report >= arguments.progress:
+                last_report = time.monotonic()
+                print(F"{count} records, {count / (last_report - start):.0f} records/s",
+                      file=sys.stderr)
+
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return_code = 130
+
+    else:
+        return_code = 0
+
+    finally:
+        destination.flush()
+        if destination is not sys.stdout:
+            destination.close()
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.monotonic() - start
+    print(F"{count} UDKs derived in {elapsed:.1f} s ({count / elapsed if elapsed else 0:.0f} UDKs/s) "
+          F"with backend '{backend.active_backend().name}', resume with --offset {arguments.offset + count}",
+          file=sys.stderr)
+
+    return return_code
+
+
+#
+# helper functions
+#
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='gep3-derive-udks',
+                                     description="ICC Master Key derivation (Option A) of PAN/PSN records")
+    parser.add_argument('input', help="CSV or JSON lines file, '-' for standard input")
+    parser.add_argument('output', nargs='?', default='-', help="output file, standard output by default")
+    parser.add_argument('--imk', help=F"Issuer Master Key (hexadecimal), defaults to ${IMK_ENVIRONMENT_VARIABLE}")
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help="records format, guessed from the input file extension by default")
+    parser.add_argument('--workers', type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=F"records derived per batch (default: {BATCH_SIZE})")
+    parser.add_argument('--offset', type=int, default=0,
+                        help="number of input records to skip, to resume an interrupted run")
+    parser.add_argument('--progress', type=float, default=5.0,
+                        help="seconds between throughput reports, 0 to disable (default: 5)")
+    parser.add_argument('--backend', choices=backend.available_backends(),
+                        help=F"crypto backend (default: {backend.active_backend().name})")
+
+    return parser
+
+
+def _format(path: str) -> str:
+    return 'jsonl' if path.endswith(('.jsonl', '.json')) else 'csv'
+
+
+if __name__ == '__main__':
+    sys.exit(main())
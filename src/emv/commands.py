@@ -8,7 +8,7 @@ from enum import StrEnum
 
 # Local application imports
 # from common.ber import encode
-from common.binary import ByteString
+from common.binary import ByteString, interned
 from iso7816.apdu import CommandApdu
 from iso7816.encodings import Lc, Le
 
@@ -94,7 +94,7 @@ def GET_DATA(tag: ByteString | GetDataObject) -> GetData:
     """
     if isinstance(tag, GetDataObject):
         if len(tag.value) == 2:
-            P1 = ByteString('00')
+            P1 = interned('00')
             P2 = ByteString(tag.value)
         else:
             P1 = ByteString(tag.value[0:2])
@@ -2,6 +2,9 @@
 """
 
 # Standard library imports
+import hashlib
+import string
+from typing import Iterable
 
 # Third party imports
 try:
@@ -12,7 +15,8 @@ except ImportError:  # Graceful fallback if IceCream isn't installed.
 
 # Local application imports
 from common.binary import ByteString, HexString
-from crypto import des
+from common.cache import LruCache
+from crypto import backend
 
 
 # Function definitions
@@ -29,18 +33,57 @@ def generate_dcvv(udk: ByteString, pan: str, atc: str, expiration_date: str, *,
     block_b = input_block[8:16]
     ic(block_a, block_b)
 
-    block_c = des.dea_e(udk_a, block_a)
+    block_c = backend.encrypt(udk_a, block_a)
     block_d = block_c ^ block_b
-    block_e = des.dea_e(udk_a, block_d)
-    block_f = des.dea_d(udk_b, block_e)
-    block_g = des.dea_e(udk_a, block_f)
-    assert block_g == des.mac_2_ede(udk, input_block)
+    block_e = backend.encrypt(udk_a, block_d)
+    block_f = backend.decrypt(udk_b, block_e)
+    block_g = backend.encrypt(udk_a, block_f)
+    assert block_g == backend.mac(udk, input_block)
     block_h = block_g.dscan_decimalize
     ic(block_c, block_d, block_e, block_f, block_g, block_h)
 
     return block_h[0:3]
 
 
+def generate_dcvvs(udk: ByteString, pan: str, atcs: Iterable[int | str], expiration_date: str, *,
+                   service_code='000') -> list[str]:
+    """generate_dcvvs(): dCVV for each ATC in 'atcs' (ints, or 4-digit hexadecimal strings)
+
+    Same result as generate_dcvv() for each ATC, but the key schedules and the ATC
+    independent second input block are computed once, and each DES step of the
+    computation runs on all ATCs at once through the active crypto.backend.
+    """
+    atcs = [_atc_hex(atc) for atc in atcs]
+    if not atcs:
+        return []
+
+    udk_bytes = udk.bytes
+    key_a = backend.active_backend().key(udk_bytes[0:8])
+    key_b = backend.active_backend().key(udk_bytes[8:16])
+
+    tail = F"{pan[4:]}{expiration_date}{service_code}"
+    input_blocks = [F"{atc}{tail}".ljust(32, '0') for atc in atcs]
+    blocks_a = bytes.fromhex(''.join(block[0:16] for block in input_blocks))
+    blocks_b = bytes.fromhex(input_blocks[0][16:32]) * len(atcs)
+
+    # one encrypt_blocks()/decrypt_blocks() call per step of generate_dcvv()
+    blocks_c = key_a.encrypt_blocks(blocks_a)
+    blocks_d = (int.from_bytes(blocks_c, 'big') ^ int.from_bytes(blocks_b, 'big')).to_bytes(len(blocks_c), 'big')
+    blocks_g = key_a.encrypt_blocks(key_b.decrypt_blocks(key_a.encrypt_blocks(blocks_d)))
+
+    return [HexString(blocks_g[i:i+8]).dscan_decimalize[0:3] for i in range(0, len(blocks_g), 8)]
+
+
+def verify_dcvv(udk: ByteString, pan: str, dcvv: str, atcs: Iterable[int], expiration_date: str, *,
+                service_code='000') -> list[int]:
+    """verify_dcvv(): ATCs of the window 'atcs' (e.g. range(last_atc + 1, last_atc + 21)) for which 'dcvv' is valid
+    """
+    atcs = list(atcs)
+    dcvvs = generate_dcvvs(udk, pan, atcs, expiration_date, service_code=service_code)
+
+    return [atc for atc, candidate in zip(atcs, dcvvs) if candidate == dcvv]
+
+
 def generate_ivcvc3(udk: ByteString, track: str) -> str:
     if (len(track) % 16) == 0:
         block = track + "8000000000000000"
@@ -48,13 +91,69 @@ def generate_ivcvc3(udk: ByteString, track: str) -> str:
         block = track + "80" + "0" * (16 - len(track) % 16 - 2)
     ic(block)
 
-    mac = des.mac_2_ede(udk, ByteString(block))
+    mac = backend.mac(udk, ByteString(block))
     ic(mac)
 
     return str(mac[-2:])
 
 
 def generate_cvc3(udk: ByteString, block: str) -> str:
-    cryptogram = des.tdea_2_ede(udk, ByteString(block))
+    cryptogram = backend.encrypt(udk, ByteString(block))
     ic(cryptogram)
     return F"{int(cryptogram[-2:]):05d}"
+
+
+# IVCVC3 by (UDK fingerprint, track): only changes when the card is reissued.
+# ivcvc3_cache.clear() drops all entries, e.g. after a key rotation.
+ivcvc3_cache = LruCache(capacity=4096)
+
+
+def cached_ivcvc3(udk: ByteString, track: str) -> str:
+    """cached_ivcvc3(): generate_ivcvc3(), taken from ivcvc3_cache when possible
+    """
+    return ivcvc3_cache.get_or_create((_fingerprint(udk), track), lambda: generate_ivcvc3(udk, track))
+
+
+def generate_cvc3s(udk: ByteString, ivcvc3: str, pairs: Iterable[tuple[str, int | str]]) -> list[str]:
+    """generate_cvc3s(): CVC3 for each (unpredictable number, ATC) pair, the ATC as an int or 4-digit hexadecimal string
+
+    Same result as generate_cvc3() for each pair, with a single encrypt_blocks() call
+    of the active crypto.backend for all pairs.
+    """
+    blocks = bytes.fromhex(''.join(F"{ivcvc3}{un}{_atc_hex(atc)}" for un, atc in pairs))
+    if not blocks:
+        return []
+
+    cryptograms = backend.active_backend().key(udk.bytes).encrypt_blocks(blocks)
+
+    return [F"{int.from_bytes(cryptograms[i+6:i+8], 'big'):05d}" for i in range(0, len(cryptograms), 8)]
+
+
+def verify_cvc3(udk: ByteString, track: str, un: str, cvc3: str, atcs: Iterable[int]) -> list[int]:
+    """verify_cvc3(): ATCs of the window 'atcs' for which 'cvc3' is valid
+
+    'cvc3' can be truncated to its last digits, as sent in the discretionary data.
+    """
+    atcs = list(atcs)
+    cvc3s = generate_cvc3s(udk, cached_ivcvc3(udk, track), [(un, atc) for atc in atcs])
+
+    return [atc for atc, candidate in zip(atcs, cvc3s) if candidate.endswith(cvc3)]
+
+
+#
+# helper functions
+#
+def _fingerprint(udk: ByteString) -> bytes:
+    # the cache doesn't hold the UDK itself
+    return hashlib.blake2b(udk.bytes, digest_size=16).digest()
+
+
+def _atc_hex(atc: int | str) -> str:
+    # the batch functions slice the input blocks at fixed offsets: the ATC is exactly 2 bytes
+    if isinstance(atc, str):
+        if len(atc) != 4 or not all(c in string.hexdigits for c in atc):
+            raise ValueError(F"ATC should be 4 hexadecimal digits, received '{atc}'")
+        return atc
+    if not 0 <= atc <= 0xFFFF:
+        raise ValueError(F"ATC should be between 0 and 0xFFFF, received {atc}")
+    return F"{atc:04X}"
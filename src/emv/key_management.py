@@ -2,6 +2,10 @@
 """
 
 # Standard library imports
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
 
 # Third party imports
 try:
@@ -13,7 +17,8 @@ except ImportError:  # Graceful fallback if IceCream isn't installed.
 # Local application imports
 from common import hstr
 from common.binary import ByteString
-from crypto import des
+from crypto import backend, des
+from crypto.modes import BlockCipher
 
 
 # Function definitions
@@ -27,8 +32,83 @@ def master_key_derivation_A(imk: ByteString, pan: str, psn: str = '00'):
     Y = ByteString(X[-16:])
     ic(X, Y)
 
-    Zl = des.adjust_parity(des.tdea_2_ede(imk, Y))
-    Zr = des.adjust_parity(des.tdea_2_ede(imk, ~Y))
+    Zl = des.adjust_parity(backend.encrypt(imk, Y))
+    Zr = des.adjust_parity(backend.encrypt(imk, ~Y))
     ic(Zl, Zr)
 
     return Zl + Zr
+
+
+# Number of PAN/PSN pairs derived per call to the cipher (and per task sent to a worker)
+BATCH_SIZE = 4096
+
+
+def derive_udks(imk: ByteString, records: Iterable[tuple[str, str]], *, workers: int = 1,
+                batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """derive_udks(): ICC Master Key derivation (Option A) of many (PAN, PSN) pairs
+
+    The IMK schedule is expanded once, by the active crypto.backend. Each batch of
+    'batch_size' pairs is derived with a single encrypt_blocks() call for both
+    halves. With 'workers' > 1, batches are spread over a pool of processes, each
+    preloaded with the IMK schedule, with at most two batches per worker in flight
+    so that memory stays bounded whatever the number of records.
+
+    The UDKs are yielded in input order, as 16-byte 'bytes' objects.
+    """
+    imk_bytes = des.to_bytes(imk)
+    batches = _batches(records, batch_size)
+
+    if workers <= 1:
+        key = backend.active_backend().key(imk_bytes)
+        for batch in batches:
+            yield from _derive_batch(key, batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(imk_bytes, backend.active_backend().name)) as executor:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(executor.submit(_worker_derive_batch, batch))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+#
+# helper functions
+#
+# bytes.translate() table computing ~Y
+_INVERT = bytes(0xFF - byte for byte in range(256))
+
+
+def _derivation_block(pan: str, psn: str) -> bytes:
+    X = pan + psn
+    return bytes.fromhex(X.rjust(16, '0')[-16:])
+
+
+def _derive_batch(key: BlockCipher, batch: list[tuple[str, str]]) -> list[bytes]:
+    Y = b''.join(_derivation_block(pan, psn) for pan, psn in batch)
+    Z = des.adjust_parity_bytes(key.encrypt_blocks(Y + Y.translate(_INVERT)))
+
+    return [Z[i:i+8] + Z[len(Y)+i:len(Y)+i+8] for i in range(0, len(Y), 8)]
+
+
+def _batches(records: Iterable[tuple[str, str]], batch_size: int) -> Iterator[list[tuple[str, str]]]:
+    records = iter(records)
+    while (batch := list(islice(records, batch_size))):
+        yield batch
+
+
+# IMK schedule of a worker process, set once by the pool initializer
+_worker_key: BlockCipher | None = None
+
+
+def _init_worker(imk: bytes, backend_name: str) -> None:
+    global _worker_key
+    _worker_key = backend.select_backend(backend_name).key(imk)
+
+
+def _worker_derive_batch(batch: list[tuple[str, str]]) -> list[bytes]:
+    return _derive_batch(_worker_key, batch)
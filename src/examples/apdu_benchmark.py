@@ -0,0 +1,61 @@
+"""apdu_benchmark.py
+
+Parsing time and memory blocks of Command and Response APDUs, with their header
+bytes and status words. The parsed fields are kept, as a trace or log would: one-byte
+fields and registered status words are shared instances (common.binary.interned()),
+the blocks count per APDU shows what is still allocated.
+
+    python -m examples.apdu_benchmark
+"""
+# Standard library imports
+import timeit
+import tracemalloc
+
+# Third party imports
+
+# Local application imports
+from iso7816.apdu import CAPDU, RAPDU
+
+
+COMMANDS = [
+    '00A4040007A000000004101000',
+    '80A8000002830000',
+    '00B2011400',
+    '80CA9F3600',
+    '8050000008001122334455667700',
+    '0084000008',
+]
+RESPONSES = ['9000', '6A82', '6985', '9F3602001F9000', '6C10']
+NUMBER = 2000
+
+
+def parse() -> list:
+    """parse(): fields of the test APDUs, NUMBER times
+    """
+    fields = []
+    for _ in range(NUMBER):
+        for command in COMMANDS:
+            apdu = CAPDU(command)
+            fields.append((apdu.CLA, apdu.INS, apdu.P1, apdu.P2, list(apdu.header)))
+        for response in RESPONSES:
+            apdu = RAPDU(response)
+            fields.append((apdu.SW1, apdu.SW2, list(apdu[-2:])))
+
+    return fields
+
+
+# Example script
+if __name__ == '__main__':
+    nr_apdus = NUMBER * (len(COMMANDS) + len(RESPONSES))
+
+    tracemalloc.start()
+    fields = parse()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = snapshot.statistics('filename')
+    blocks, size = sum(s.count for s in statistics), sum(s.size for s in statistics)
+    del fields
+
+    seconds = min(timeit.repeat(parse, number=1, repeat=5))
+    print(F"{nr_apdus} APDUs: {seconds / nr_apdus * 1e6:.1f} us/APDU, "
+          F"{blocks / nr_apdus:.1f} blocks/APDU, {size / nr_apdus:.0f} bytes/APDU kept")
@@ -0,0 +1,41 @@
+"""binary_benchmark.py
+
+Construction time of HexString, ByteString and BitString from strings of 1 B to
+1 MB. Validation is linear: the time per byte should stay about constant as the
+input grows.
+
+    python -m examples.binary_benchmark
+"""
+# Standard library imports
+import timeit
+
+# Third party imports
+
+# Local application imports
+from common.binary import BitString, ByteString, HexString
+
+
+SIZES = [1, 16, 256, 4 << 10, 64 << 10, 1 << 20]
+
+
+def measure(constructor, value: str, *, min_time: float = 0.2) -> float:
+    """measure(): seconds per call of constructor(value)
+    """
+    timer = timeit.Timer(lambda: constructor(value))
+    number, elapsed = timer.autorange()
+    while elapsed < min_time:
+        number *= 2
+        elapsed = timer.timeit(number)
+
+    return elapsed / number
+
+
+# Example script
+if __name__ == '__main__':
+    print(F"{'class':<12}{'input':>10}{'time (us)':>14}{'ns/byte':>10}")
+    for constructor, digits_per_byte, digit in [(HexString, 2, 'a'), (ByteString, 2, 'a'), (BitString, 8, '1')]:
+        for size in SIZES:
+            # one '_' separator every 4 digits, as in the test vectors
+            value = '_'.join([digit * 4] * (size * digits_per_byte // 4)) or digit * digits_per_byte
+            seconds = measure(constructor, value)
+            print(F"{constructor.__name__:<12}{size:>10}{seconds * 1e6:>14.1f}{seconds * 1e9 / size:>10.1f}")
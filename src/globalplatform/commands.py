@@ -8,7 +8,7 @@ from typing import Optional
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString
+from common.binary import ByteString, interned
 from iso7816.apdu import CommandApdu
 from iso7816.encodings import ClassByte as ISO_ClassByte
 from .encodings import ClassByte, GetDataObject, FileOccurrence, ApplicationIdentifier
@@ -29,7 +29,7 @@ def GET_DATA(CLA: ClassByte, tag: ByteString | GetDataObject, data: Optional[Byt
     """
     if isinstance(tag, GetDataObject):
         if len(tag.value) == 2:
-            P1 = ByteString('00')
+            P1 = interned('00')
             P2 = ByteString(tag.value)
         else:
             P1 = ByteString(tag.value[0:2])
@@ -6,35 +6,46 @@
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString
-from crypto.des import tdea_2_ede_ecb, tdea_2_ede_cbc
+from common.binary import ByteBuffer, ByteString
+from crypto.backend import ecb_encrypt, cbc_encrypt
 
 
 # CARD KEYS
 def S_ENC_DK(S_ENC_KMC: ByteString, derivation_id: ByteString):
-    return tdea_2_ede_ecb(S_ENC_KMC, ByteString(F"{derivation_id}F001{derivation_id}0F01"))
+    return ecb_encrypt(S_ENC_KMC, _card_key_derivation_data(derivation_id, 0x01))
 
 
 def S_MAC_DK(S_MAC_KMC: ByteString, derivation_id: ByteString):
-    return tdea_2_ede_ecb(S_MAC_KMC, ByteString(F"{derivation_id}F002{derivation_id}0F02"))
+    return ecb_encrypt(S_MAC_KMC, _card_key_derivation_data(derivation_id, 0x02))
 
 
 def DEK_DK(DEK_KMC: ByteString, derivation_id: ByteString):
-    return tdea_2_ede_ecb(DEK_KMC, ByteString(F"{derivation_id}F003{derivation_id}0F03"))
+    return ecb_encrypt(DEK_KMC, _card_key_derivation_data(derivation_id, 0x03))
 
 
 # SESSION KEYS
 def C_MAC_SK(S_MAC_DK: ByteString, sequence_counter: ByteString):
-    return tdea_2_ede_cbc(S_MAC_DK, ByteString(F"0101{sequence_counter}" + "00" * 12), ByteString('00' * 8))
+    return cbc_encrypt(S_MAC_DK, _session_key_derivation_data(0x0101, sequence_counter), ByteString('00' * 8))
 
 
 def R_MAC_SK(S_MAC_DK: ByteString, sequence_counter: ByteString):
-    return tdea_2_ede_cbc(S_MAC_DK, ByteString(F"0102{sequence_counter}" + "00" * 12), ByteString('00' * 8))
+    return cbc_encrypt(S_MAC_DK, _session_key_derivation_data(0x0102, sequence_counter), ByteString('00' * 8))
 
 
 def S_ENC_SK(S_ENC_DK: ByteString, sequence_counter: ByteString):
-    return tdea_2_ede_cbc(S_ENC_DK, ByteString(F"0182{sequence_counter}" + "00" * 12), ByteString('00' * 8))
+    return cbc_encrypt(S_ENC_DK, _session_key_derivation_data(0x0182, sequence_counter), ByteString('00' * 8))
 
 
 def DEK_SK(DEK_DK: ByteString, sequence_counter: ByteString):
-    return tdea_2_ede_cbc(DEK_DK, ByteString(F"0181{sequence_counter}" + "00" * 12), ByteString('00' * 8))
+    return cbc_encrypt(DEK_DK, _session_key_derivation_data(0x0181, sequence_counter), ByteString('00' * 8))
+
+
+#
+# helper functions
+#
+def _card_key_derivation_data(derivation_id: ByteString, key_type: int) -> ByteString:
+    return ByteBuffer().extend(derivation_id).extend([0xF0, key_type]).extend(derivation_id).extend([0x0F, key_type]).freeze()
+
+
+def _session_key_derivation_data(derivation_constant: int, sequence_counter: ByteString) -> ByteString:
+    return ByteBuffer(derivation_constant.to_bytes(2, 'big')).extend(sequence_counter).extend(bytes(12)).freeze()
@@ -7,9 +7,9 @@ from enum import StrEnum
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString
+from common.binary import ByteBuffer, ByteString, interned
 from iso7816.apdu import CommandApdu, ResponseApdu
-from crypto.des import tdea_2_ede_cbc, mac_2_ede
+from crypto import backend
 
 
 # Secure Channel Protocol '02' encodings defined by GP
@@ -24,11 +24,9 @@ class SecurityLevel(StrEnum):
 
 # MAC
 def mac(C_MAC_SK: ByteString, data: ByteString, iv: ByteString = ByteString('00'*8)) -> ByteString:
-    block = data + '80'
-    if len(block) % 8 != 0:
-        block += '00' * (8 - len(block) % 8)
+    block = ByteBuffer().extend(data).pad_iso9797(2)
 
-    mac = mac_2_ede(C_MAC_SK, block, iv=iv)
+    mac = backend.mac(C_MAC_SK, block.freeze(), iv=iv)
 
     return mac
 
@@ -44,21 +42,21 @@ def card_challenge(C_MAC_SK: ByteString, AID: ByteString) -> ByteString:
 
 
 def card_cryptogram(S_ENC_SK: ByteString, host_challenge: ByteString, sequence_counter: ByteString, card_challenge: ByteString) -> ByteString:
-    card_cryptogram_input = host_challenge + \
-        sequence_counter + card_challenge + '80' + '00' * 7
-    return tdea_2_ede_cbc(S_ENC_SK, card_cryptogram_input, ByteString('00' * 8))[-8:]
+    card_cryptogram_input = ByteBuffer().extend(host_challenge).extend(
+        sequence_counter).extend(card_challenge).pad_iso9797(2)
+    return backend.cbc_encrypt(S_ENC_SK, card_cryptogram_input.freeze(), ByteString('00' * 8))[-8:]
 
 
 # HOST AUTHENTICATION CRYPTOGRAM
 def host_cryptogram(S_ENC_SK: ByteString, sequence_counter: ByteString, card_challenge: ByteString, host_challenge: ByteString) -> ByteString:
-    host_cryptogram_input = sequence_counter + \
-        card_challenge + host_challenge + '80' + '00' * 7
-    return tdea_2_ede_cbc(S_ENC_SK, host_cryptogram_input, ByteString('00' * 8))[-8:]
+    host_cryptogram_input = ByteBuffer().extend(sequence_counter).extend(
+        card_challenge).extend(host_challenge).pad_iso9797(2)
+    return backend.cbc_encrypt(S_ENC_SK, host_cryptogram_input.freeze(), ByteString('00' * 8))[-8:]
 
 
 # HOST MAC
 def host_mac(C_MAC_SK: ByteString, host_cryptogram: ByteString) -> ByteString:
-    return mac(C_MAC_SK, "8482010010" + host_cryptogram)
+    return mac(C_MAC_SK, ByteBuffer.fromhex('8482010010').extend(host_cryptogram))
     # return mac_2_ede(C_MAC_SK, "8482010010" + host_cryptogram + '80' + '00' * 2)
 
 
@@ -72,7 +70,7 @@ class InitializeUpdate(CommandApdu):
             raise ValueError(
                 F"INITIALIZE UPDATE: host cryptogram should be 8 bytes, received '{host_challenge}'")
 
-        return super().__init__(CLA, ByteString('50'), key_version_number, ByteString('00'), data_field=host_challenge, Ne=256)
+        return super().__init__(CLA, interned('50'), key_version_number, interned('00'), data_field=host_challenge, Ne=256)
 
 
 def INITIALIZE_UPDATE(CLA: ByteString, key_version_number: ByteString, host_challenge: ByteString):
@@ -118,7 +116,7 @@ class ExternalAuthenticate(CommandApdu):
             raise ValueError(
                 F"EXTERNAL AUTHENTICATE: MAC should be 8 bytes, received '{MAC}'")
 
-        return super().__init__(CLA, ByteString('82'), ByteString(security_level.value), ByteString('00'), data_field=host_cryptogram+MAC, Ne=None)
+        return super().__init__(CLA, interned('82'), interned(security_level.value), interned('00'), data_field=host_cryptogram+MAC, Ne=None)
 
 
 def EXTERNAL_AUTHENTICATE(CLA: ByteString, security_level: ByteString, host_cryptogram: ByteString, MAC: ByteString):
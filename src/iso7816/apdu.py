@@ -9,7 +9,7 @@ from typing import Optional
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString
+from common.binary import ByteBuffer, ByteString, ByteStringView, register_interned
 from .encodings import Lc, Le
 
 
@@ -43,6 +43,15 @@ class ResponseProcessingState(StrEnum):
     CheckingError = 'Checking error'
 
 
+# Status words shared as interned ByteStrings (see common.binary.interned())
+STATUS_WORDS = [
+    '9000', '6100', '6200', '6281', '6282', '6283', '6300', '63C0', '6581', '6700', '6881', '6882',
+    '6982', '6983', '6984', '6985', '6986', '6A80', '6A81', '6A82', '6A83', '6A84', '6A86', '6A88',
+    '6B00', '6C00', '6D00', '6E00', '6F00']
+
+register_interned(*STATUS_WORDS)
+
+
 # Command and Response APDU classes
 class CommandApdu(ByteString):
     def __init__(self, CLA: ByteString, INS: ByteString, P1: ByteString, P2: ByteString, data_field: Optional[ByteString], Ne: Optional[int]):
@@ -51,49 +60,55 @@ class CommandApdu(ByteString):
                 raise ValueError(
                     F"{param} should be 1 byte, received: {locals()[param]}")
 
+        apdu = ByteBuffer().extend(CLA).extend(INS).extend(P1).extend(P2)
+
         match data_field, Ne:
             case None, None:
                 # Case 1
-                super().__init__(str(CLA + INS + P1 + P2))
                 self.__case = CommandCase.Case1
 
             case None, int():
                 # Case 2
-                if len(Le(Ne)) == 1:
+                Le_field = Le(Ne)
+                apdu += Le_field
+                if len(Le_field) == 1:
                     # Case 2S
-                    super().__init__(str(CLA + INS + P1 + P2 + Le(Ne)))
                     self.__case = CommandCase.Case2S
                 else:
                     # Case 2E
-                    super().__init__(str(CLA + INS + P1 + P2 + Le(Ne)))
                     self.__case = CommandCase.Case2E
 
             case ByteString(), None:
                 # Case 3
-                if len(Lc(data_field)) == 1:
+                Lc_field = Lc(data_field)
+                apdu += Lc_field
+                apdu += data_field
+                if len(Lc_field) == 1:
                     # Case 3S
-                    super().__init__(str(CLA + INS + P1 + P2 + Lc(data_field) + data_field))
                     self.__case = CommandCase.Case3S
                 else:
                     # Case 3E
-                    super().__init__(str(CLA + INS + P1 + P2 + Lc(data_field) + data_field))
                     self.__case = CommandCase.Case3E
 
             case ByteString(), int():
                 # Case 4
-                if len(Le(Ne)) == 1:
+                Le_field = Le(Ne)
+                apdu += Lc(data_field)
+                apdu += data_field
+                apdu += Le_field
+                if len(Le_field) == 1:
                     # Case 4S
-                    super().__init__(str(CLA + INS + P1 + P2 + Lc(data_field) + data_field + Le(Ne)))
                     self.__case = CommandCase.Case4S
                 else:
                     # Case 4E
-                    super().__init__(str(CLA + INS + P1 + P2 + Lc(data_field) + data_field + Le(Ne)))
                     self.__case = CommandCase.Case4E
 
             case _, _:
                 raise ValueError(
                     F"Received wrong data_field ({data_field}) and/or Ne ({Ne})")
 
+        super().__init__(apdu.freeze())
+
     @property
     def case(self) -> CommandCase:
         return self.__case
@@ -104,7 +119,7 @@ class CommandApdu(ByteString):
 
     @property
     def body(self) -> ByteString:
-        return self[4:]
+        return ByteStringView(self, 4)
 
     @property
     def CLA(self) -> ByteString:
@@ -143,16 +158,16 @@ class CommandApdu(ByteString):
                     F'Command APDU has no Data field ({self.case.value})')
 
             case CommandCase.Case3S:
-                return self[5:]
+                return ByteStringView(self, 5)
 
             case CommandCase.Case4S:
-                return self[5:-1]
+                return ByteStringView(self, 5, len(self) - 6)
 
             case CommandCase.Case3E:
-                return self[7:]
+                return ByteStringView(self, 7)
 
             case CommandCase.Case4E:
-                return self[7:-2]
+                return ByteStringView(self, 7, len(self) - 9)
 
     @property
     def Le(self) -> ByteString:
@@ -271,7 +286,7 @@ class StatusBytes(ByteString):
         if sw12.startswith('60'):
             raise ValueError(F"60XX in invalid, received: {sw12}")
 
-        super().__init__(str(sw12))
+        super().__init__(sw12)
 
     @property
     def state(self) -> ResponseProcessingState:
@@ -444,22 +459,29 @@ class StatusBytes(ByteString):
                 return 'Unkown meaning'
 
 
+# StatusBytes of STATUS_WORDS, shared by all ResponseApdu.SW12
+_STATUS_BYTES = {status_bytes.bytes: status_bytes for status_bytes in map(StatusBytes, map(ByteString, STATUS_WORDS))}
+
+
 class ResponseApdu(ByteString):
     def __init__(self, response: ByteString):
         if len(response) < 2:
             raise ValueError(
                 F"Expecting reponse of at least 2 bytes, received: {response}")
-        super().__init__(str(response))
+        super().__init__(response)
 
     @property
     def body(self) -> ByteString:
         if len(self) > 2:
-            return self[0:-2]
+            return ByteStringView(self, 0, len(self) - 2)
         else:
             raise ValueError(F"No response body")
 
     @property
     def SW12(self) -> StatusBytes:
+        sw12 = self._bytes[-2:]
+        if (status_bytes := _STATUS_BYTES.get(sw12)) is not None:
+            return status_bytes
         return StatusBytes(self[-2:])
 
     @property
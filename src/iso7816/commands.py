@@ -7,7 +7,7 @@ from typing import Optional
 # Third party imports
 
 # Local application imports
-from common.binary import ByteString
+from common.binary import ByteString, interned
 from .apdu import CommandApdu
 from .encodings import CLA, Selection, FileOccurrence, FileControlInformation
 
@@ -47,7 +47,7 @@ def SELECT(class_byte: ByteString,
            fci: FileControlInformation,
            data_field: Optional[ByteString],
            Ne: Optional[int]) -> Select:
-    P1 = ByteString(F"{selection.value:02X}")
-    P2 = ByteString(F"{file_occurrence.value + fci.value:02X}")
+    P1 = interned(F"{selection.value:02X}")
+    P2 = interned(F"{file_occurrence.value + fci.value:02X}")
 
     return Select(class_byte, P1, P2, data_field, Ne)
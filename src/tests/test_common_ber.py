@@ -6,7 +6,8 @@ import unittest
 # Third party imports
 
 # Local application imports
-from common.ber import HexString, TagClass, TagConstruction, Tag, create_tag, Length, create_length, T_fieldP, L_fieldP, parserc, TagLengthValueP
+from common.binary import ByteString
+from common.ber import HexString, TagClass, TagConstruction, Tag, create_tag, Length, create_length, TagLengthValue, read_tag, read_length, read_tlv, iter_tlv, parse_tree, TlvIndex, TlvStreamParser, parse_stream, encode_tlv
 
 
 #
@@ -51,23 +52,129 @@ class TestMethods(unittest.TestCase):
         self.assertEqual(create_length(HexString('FF'*5)), Length('05'))
         self.assertEqual(create_length(HexString('FF'*1020)), Length('8203FC'))
 
-    def test_T_fieldP(self):
-        self.assertEqual(T_fieldP.parse_partial('6F108408A000000003000000A5049F6501FF'),
-                         ('6F', '108408A000000003000000A5049F6501FF'))
-        self.assertEqual(T_fieldP.parse_partial('9F272D' + 'FF'*0x2d),
-                         ('9F27', '2D' + 'FF'*0x2d))
-
-    def test_L_fieldP(self):
-        self.assertEqual(L_fieldP.parse_partial('108408A000000003000000A5049F6501FF'),
-                         ('10', '8408A000000003000000A5049F6501FF'))
-        self.assertEqual(L_fieldP.parse_partial('8180FF'),
-                         ('8180', 'FF'))
-
-    def test_TagLengthValueP(self):
-        self.assertEqual(TagLengthValueP.parse_partial('8408A000000003000000A5049F6501FF'),
-                         (('84', '08', 'A000000003000000'), 'A5049F6501FF'))
-        self.assertEqual(parserc.many(TagLengthValueP).parse('8408A000000003000000A5049F6501FF'),
-                         [('84', '08', 'A000000003000000'), ('A5', '04', '9F6501FF')])
+    def test_TagLengthValue(self):
+        tlv = TagLengthValue('00006F108408A000000003000000A5049F6501FF00')
+        self.assertEqual(tlv.tag, Tag('6F'))
+        self.assertEqual(tlv.length.value, 0x10)
+        self.assertEqual(tlv.value, '8408A000000003000000A5049F6501FF')
+
+        with self.assertRaises(ValueError):
+            TagLengthValue('8408A000000003000000A5049F6501FF')
+        with self.assertRaises(ValueError):
+            TagLengthValue('8408A0000000030000')
+
+    def test_read_tag(self):
+        self.assertEqual(read_tag(bytes.fromhex('6F108408A000000003000000A5049F6501FF')), 1)
+        self.assertEqual(read_tag(bytes.fromhex('9F272D' + 'FF'*0x2d)), 2)
+        self.assertEqual(read_tag(bytes.fromhex('00BF0C8101FF'), 1), 3)
+
+        with self.assertRaises(ValueError):
+            read_tag(bytes.fromhex('9F'))
+        with self.assertRaises(ValueError):
+            read_tag(bytes.fromhex('9F81'), end=1)
+
+    def test_read_length(self):
+        self.assertEqual(read_length(bytes.fromhex('108408A000000003000000A5049F6501FF')), (0x10, 1))
+        self.assertEqual(read_length(bytes.fromhex('8180FF')), (0x80, 2))
+        self.assertEqual(read_length(memoryview(bytes.fromhex('5F248203FC')), 2), (1020, 5))
+
+        with self.assertRaises(ValueError):
+            read_length(bytes.fromhex('8201'))
+
+    def test_read_tlv(self):
+        self.assertEqual(read_tlv(bytes.fromhex('8408A000000003000000A5049F6501FF')), (bytes.fromhex('84'), 8, 2))
+        self.assertEqual(list(iter_tlv(bytes.fromhex('8408A000000003000000A5049F6501FF'))),
+                         [(bytes.fromhex('84'), 8, 2), (bytes.fromhex('A5'), 4, 12)])
+        self.assertEqual(list(iter_tlv(bytes.fromhex('0000A5049F6501FF0000' '9F3602001F' '00'))),
+                         [(bytes.fromhex('A5'), 4, 4), (bytes.fromhex('9F36'), 2, 13)])
+        self.assertEqual(list(iter_tlv(bytes.fromhex('A5049F6501FF'), 2, 6)), [(bytes.fromhex('9F65'), 1, 5)])
+
+        with self.assertRaises(ValueError):
+            list(iter_tlv(bytes.fromhex('A5049F6501FF'), 2, 5))
+
+    def test_parse_tree(self):
+        fci = bytes.fromhex('6F1A8407A0000000041010A50F500A4D617374657243617264870101')
+        nodes = parse_tree(fci + bytes(2))
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual((nodes[0].tag, nodes[0].length, nodes[0].offset, nodes[0].value_offset, nodes[0].end),
+                         (bytes.fromhex('6F'), 0x1A, 0, 2, 28))
+        self.assertIsNone(nodes[0]._children)
+
+        self.assertEqual(nodes[0]['84'].value, 'A0000000041010')
+        self.assertEqual(nodes[0]['A5'][1].value, '01')
+        self.assertEqual([child.tag for child in nodes[0]], [bytes.fromhex('84'), bytes.fromhex('A5')])
+        self.assertIs(nodes[0].children, nodes[0].children)
+        self.assertIsNone(nodes[0].get('9F38'))
+
+        with self.assertRaises(KeyError):
+            nodes[0]['9F38']
+        with self.assertRaises(ValueError):
+            nodes[0]['84'].children
+
+    def test_TlvIndex(self):
+        fci = ByteString('6F338407A0000000041010A528500A4D617374657243617264870101'
+                         'BF0C1661144F07A00000000410109F0A080001050100000000')
+        index = TlvIndex(fci)
+        self.assertEqual(list(index), ['6F', '84', 'A5', '50', '87', 'BF0C', '61', '4F', '9F0A'])
+        self.assertEqual(index['84'], 'A0000000041010')
+        self.assertEqual(index['6F/A5/BF0C/61/4F'], 'A0000000041010')
+        self.assertEqual(index.find('61/4F').path, ('6F', 'A5', 'BF0C', '61'))
+        self.assertEqual(index.find('bf0c').depth, 2)
+        self.assertEqual(index.occurrences('A5/4F'), [])
+        self.assertIsNone(index.find('9F38'))
+        self.assertIsNone(index.get('9F38'))
+        with self.assertRaises(KeyError):
+            index['9F38']
+
+        records = [TlvIndex(bytes.fromhex('7006940408010100')), TlvIndex(bytes.fromhex('70059F360200129000')[:7])]
+        merged = TlvIndex.merge(*records)
+        self.assertEqual(merged['94'], '08010100')
+        self.assertEqual(merged['70/9F36'], '0012')
+        self.assertEqual([occurrence.offset for occurrence in merged.occurrences('70')], [0, 0])
+        self.assertEqual(len(records[0]), 2)
+
+    def test_TlvStreamParser(self):
+        stream = bytes.fromhex('0000' '6F098407A0000000041010' '9F36020012' '00' '5F2081' '80' + '41' * 0x80 + 'DF810100' '00')
+        parser = TlvStreamParser()
+        self.assertEqual(parser.feed(stream[0:4]), [])
+        self.assertEqual(parser.pending, 2)
+
+        nodes = parser.feed(stream[4:18])
+        self.assertEqual([node.tag for node in nodes], [bytes.fromhex('6F'), bytes.fromhex('9F36')])
+        self.assertEqual(nodes[0]['84'].value, 'A0000000041010')
+        self.assertEqual(parser.feed(stream[18:21]), [])
+        self.assertEqual(parser.pending, 2)
+        with self.assertRaises(ValueError):
+            parser.close()
+        self.assertEqual([node.tag for node in parser.feed(stream[21:])], [bytes.fromhex('5F20'), bytes.fromhex('DF8101')])
+        parser.close()
+
+        nodes = list(parse_stream(stream[i:i+7] for i in range(0, len(stream), 7)))
+        self.assertEqual([(node.tag, node.length) for node in nodes],
+                         [(tag, length) for tag, length, _ in iter_tlv(stream)])
+        self.assertEqual(nodes[2].value, '41' * 0x80)
+
+        with self.assertRaises(ValueError):
+            list(parse_stream([stream[0:10]]))
+
+    def test_encode_tlv(self):
+        fci = encode_tlv([('6F', [('84', 'A0000000041010'),
+                                  ('A5', [('50', b'MasterCard'), ('87', ByteString('01')),
+                                          ('BF0C', [('61', [('4F', 'A0000000041010'), ('9F0A', '0001050100000000')])])])])])
+        self.assertEqual(fci, '6F338407A0000000041010A528500A4D617374657243617264870101'
+                              'BF0C1661144F07A00000000410109F0A080001050100000000')
+
+        self.assertEqual(encode_tlv([('9F36', '0012'), (b'\x80', b'')]), '9F360200128000')
+        self.assertEqual(encode_tlv([('5F20', b'A' * 0x80)])[0:5], '5F20818041')
+        self.assertEqual(TlvIndex(encode_tlv([('70', [('9F4D', '0B0A')] * 100)])).find('70').length, 500)
+        self.assertEqual(encode_tlv([('DF8101', b'\x00' * 0x100)])[0:6], 'DF8101820100')
+
+        with self.assertRaises(ValueError):
+            encode_tlv([('9F', '00')])
+        with self.assertRaises(ValueError):
+            encode_tlv([('5A08', '00')])
+        with self.assertRaises(TypeError):
+            encode_tlv([('84', 5)])
 
     # def test_parse(self):
     #     self.assertEqual(find('6F', [('6F', '10', [('84', '08', 'A000000003000000'), ('A5', '04', [('9F65', '01', 'FF')])])]),
@@ -0,0 +1,204 @@
+"""test_common_binary.py
+"""
+
+# Standard library imports
+import pickle
+import unittest
+
+# Local application imports
+from common.binary import BitString, ByteBuffer, ByteString, ByteStringView, HexString, interned, register_interned
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'binary' module
+    """
+
+    def test_validation(self):
+        self.assertEqual(str(HexString('01_23_ab')), '0123AB')
+        self.assertEqual(str(HexString('01 23', ignore=' ')), '0123')
+        self.assertEqual(str(BitString('0101_1111')), '01011111')
+        self.assertEqual(str(ByteString('ab' * 50000)), 'AB' * 50000)
+        with self.assertRaisesRegex(TypeError, "Character ' ' not allowed in hexadecimal string"):
+            HexString('01 23')
+        with self.assertRaisesRegex(TypeError, "Character 'g' not allowed in hexadecimal string"):
+            ByteString('01_g3')
+        with self.assertRaisesRegex(TypeError, "Character '2' not allowed in bit string"):
+            BitString('0121')
+
+    def test_ByteString(self):
+        byte_string = ByteString('00a4_0400')
+        self.assertEqual(str(byte_string), '00A40400')
+        self.assertEqual(repr(byte_string), "ByteString('00A40400')")
+        self.assertEqual(byte_string.bytes, bytes.fromhex('00A40400'))
+        self.assertEqual(ByteString(byte_string.bytes), byte_string)
+        self.assertEqual(ByteString(bytearray(byte_string.bytes)), byte_string)
+        self.assertEqual(ByteString([0, 0xA4, 4, 0]), byte_string)
+        self.assertEqual(str(ByteString(0)), '00')
+        self.assertEqual(str(ByteString(0x100)), '0100')
+        self.assertEqual(ByteString(byte_string).bytes, byte_string.bytes)
+        with self.assertRaises(ValueError):
+            ByteString('A40')
+        with self.assertRaises(ValueError):
+            ByteString(-1)
+        with self.assertRaises(TypeError):
+            ByteString('A4G0')
+        with self.assertRaises(TypeError):
+            ByteString(1.0)
+
+    def test_ByteString_sequence(self):
+        byte_string = ByteString('00A40400')
+        self.assertEqual(len(byte_string), 4)
+        self.assertEqual(str(byte_string[1]), 'A4')
+        self.assertEqual(str(byte_string[-2]), '04')
+        self.assertEqual(str(byte_string[1:3]), 'A404')
+        self.assertEqual(len(byte_string[4:]), 0)
+        self.assertEqual([str(b) for b in byte_string], ['00', 'A4', '04', '00'])
+        self.assertEqual(byte_string.list, [0, 0xA4, 4, 0])
+        with self.assertRaises(IndexError):
+            byte_string[4]
+
+    def test_ByteString_operators(self):
+        byte_string = ByteString('00A40400')
+        self.assertEqual(str(byte_string + ByteString('0A')), '00A404000A')
+        self.assertEqual(str(byte_string + '0a'), '00A404000A')
+        self.assertEqual(str('80' + byte_string), '8000A40400')
+        self.assertEqual(str(byte_string + HexString('0A')), '00A404000A')
+        self.assertEqual(str(ByteString('00') * 3), '000000')
+        self.assertEqual(str(ByteString('00') + 12), '0012')
+        self.assertEqual(str(12 + ByteString('00')), '1200')
+        self.assertEqual(str(ByteString('00') + b'\x0c'), '000C')
+        self.assertIsInstance(byte_string + '0A', ByteString)
+        with self.assertRaises(ValueError):
+            byte_string + '0'
+
+        self.assertEqual(byte_string, '00a40400')
+        self.assertEqual(byte_string, 0xA40400)
+        self.assertEqual(byte_string, HexString('A40400'))
+        self.assertLess(byte_string, ByteString('00A40401'))
+        self.assertEqual(hash(byte_string), hash(HexString('00a40400')))
+        self.assertEqual({byte_string: 1}[ByteString('00A40400')], 1)
+        self.assertEqual(pickle.loads(pickle.dumps(byte_string)), byte_string)
+
+    def test_bitwise_operators(self):
+        self.assertEqual(str(ByteString('00FF') ^ ByteString('0F')), '00F0')
+        self.assertEqual(str(ByteString('0F') | ByteString('F000')), 'F00F')
+        self.assertEqual(str(ByteString('1234') & ByteString('FF00')), '1200')
+        self.assertEqual(str(~ByteString('00F0')), 'FF0F')
+        self.assertEqual(str(HexString('0F0') ^ HexString('FF')), '00F')
+        self.assertEqual(str(~HexString('0A')), 'F5')
+        self.assertEqual(repr(ByteString('ABCD') ^ HexString('0F0F')), "ByteString('A4C2')")
+        self.assertEqual((ByteString('FF00') & HexString('F0F')).bytes, bytes.fromhex('0F00'))
+        self.assertEqual(str(BitString('0011') ^ BitString('101')), '0110')
+        self.assertEqual(str(~BitString('0011')), '1100')
+
+    def test_BitString(self):
+        bit_string = BitString('1011_0001_1')
+        self.assertEqual((int(bit_string), len(bit_string)), (0b101100011, 9))
+        self.assertEqual(str(bit_string[1:5]), '0110')
+        self.assertEqual(str(bit_string[-1]), '1')
+        self.assertEqual(str(bit_string + '01'), '10110001101')
+        self.assertEqual(str(bit_string.lpad(12)), '000101100011')
+        self.assertEqual(str(bit_string.rpad(12)), '101100011000')
+        self.assertEqual(str(bit_string.left_circular_shit(2)), '110001110')
+        self.assertEqual(str(bit_string.permute([9, 1, 1])), '111')
+        self.assertEqual(bit_string.byte_string, '0163')
+        self.assertEqual(str(BitString(b'\x0F')), '00001111')
+        self.assertEqual(str(BitString(0)), '0')
+        with self.assertRaises(IndexError):
+            bit_string[9]
+        with self.assertRaises(ValueError):
+            BitString(-1)
+
+    def test_interned(self):
+        byte_string = ByteString('00A4040C')
+        self.assertIs(byte_string[1], interned('A4'))
+        self.assertIs(list(byte_string)[2], byte_string[2:3])
+        self.assertIs(interned(0x0C), interned('0c'))
+        self.assertIsNot(interned('AB12'), interned('AB12'))
+
+        register_interned('AB12')
+        self.assertIs(interned('AB12'), interned(ByteString('ab_12')))
+        self.assertEqual(interned('AB12'), 'AB12')
+        self.assertEqual(interned('123456'), '123456')
+
+    def test_ByteStringView(self):
+        byte_string = ByteString(bytes(range(20)))
+        blocks = list(byte_string.blocks(8))
+        self.assertEqual([len(block) for block in blocks], [8, 8, 4])
+        self.assertIsInstance(blocks[1], ByteStringView)
+        self.assertEqual(blocks[1], '08090A0B0C0D0E0F')
+        self.assertEqual(blocks[1].memoryview.obj, byte_string.bytes)
+        self.assertEqual(hash(blocks[2]), hash(ByteString('10111213')))
+
+        view = ByteStringView(byte_string, 2, 5)
+        self.assertEqual((view.parent, view.offset, view.length), (byte_string, 2, 5))
+        self.assertEqual(view[1:3], '0304')
+        self.assertIs(view[-1], interned('06'))
+        self.assertEqual(view + 'FF', '0203040506FF')
+        self.assertEqual(type(view ^ ByteString('FF')), ByteString)
+        self.assertEqual(view.lpad(6), '000203040506')
+        self.assertEqual(pickle.loads(pickle.dumps(view)), view)
+        self.assertEqual(ByteStringView(byte_string, 16, 4), '10111213')
+        self.assertEqual(ByteStringView(byte_string, 20), '')
+        with self.assertRaises(ValueError):
+            ByteStringView(byte_string, 21)
+        with self.assertRaises(ValueError):
+            ByteStringView(byte_string, 16, 5)
+
+    def test_ByteBuffer(self):
+        buffer = ByteBuffer(bytes.fromhex('00FF'))
+        buffer ^= ByteString('0F')
+        self.assertEqual(buffer, bytes.fromhex('00F0'))
+        buffer |= bytes.fromhex('010000')
+        self.assertEqual(buffer, bytes.fromhex('0100F0'))
+        buffer &= ByteString('FFF0')
+        self.assertEqual(buffer, bytes.fromhex('0000F0'))
+        self.assertEqual(buffer.invert(), bytes.fromhex('FFFF0F'))
+        self.assertEqual(ByteString(buffer), 'FFFF0F')
+        self.assertEqual(repr(buffer), "ByteBuffer('FFFF0F')")
+
+    def test_ByteBuffer_builder(self):
+        buffer = ByteBuffer().append(0x84).append(ByteString('82')).extend('0100').extend(ByteString('10'))
+        buffer += bytes.fromhex('1122')
+        self.assertEqual(buffer, bytes.fromhex('8482010010' '1122'))
+        with self.assertRaises(ValueError):
+            buffer.append(ByteString('0102'))
+
+        self.assertEqual(ByteBuffer.fromhex('0102').pad_iso9797(1), bytes.fromhex('0102000000000000'))
+        self.assertEqual(ByteBuffer().pad_iso9797(1), bytes(8))
+        self.assertEqual(ByteBuffer(bytes(8)).pad_iso9797(1), bytes(8))
+        self.assertEqual(ByteBuffer(bytes(8)).pad_iso9797(2), bytes(8) + bytes.fromhex('8000000000000000'))
+        with self.assertRaises(ValueError):
+            ByteBuffer().pad_iso9797(3)
+
+        self.assertEqual(ByteBuffer(bytes(4)).xor_into(ByteString('FF0F'), 1), bytes.fromhex('00FF0F00'))
+        with self.assertRaises(ValueError):
+            ByteBuffer(bytes(4)).xor_into(bytes(2), 3)
+
+        frozen = buffer.freeze()
+        self.assertEqual(frozen, '84820100101122')
+        hash(frozen)
+        buffer.xor_into(b'\xff')
+        buffer[1] = 0
+        buffer.append(0)
+        self.assertEqual(frozen, '84820100101122')
+        self.assertEqual(frozen.data, '84820100101122')
+        self.assertEqual(hash(frozen), hash('84820100101122'))
+
+    def test_HexString(self):
+        hex_string = HexString('0a_bc')
+        self.assertEqual(hex_string.data, '0ABC')
+        self.assertEqual(repr(hex_string), "HexString('0ABC')")
+        self.assertEqual(hash(hex_string), hash('0ABC'))
+        self.assertEqual(int(hex_string), 0x0ABC)
+        self.assertTrue(hex_string == '0abc')
+        self.assertTrue(hex_string == 'ABC')
+        self.assertFalse(ByteString('9000') == '9001')
+        self.assertTrue(ByteString('0090') == '90')
+
+
+if __name__ == '__main__':
+    unittest.main()
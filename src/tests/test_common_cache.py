@@ -0,0 +1,47 @@
+"""test_common_cache.py
+"""
+# Standard library imports
+import unittest
+
+# Third party imports
+
+# Local application imports
+from common.cache import LruCache
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    def test_LruCache(self):
+        cache = LruCache(capacity=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 1, 1))
+
+        self.assertEqual(cache.get_or_create('d', lambda: 4), 4)
+        self.assertEqual(cache.get_or_create('d', lambda: 5), 4)
+        self.assertEqual(len(cache), 2)
+
+        cache.capacity = 1
+        self.assertEqual(len(cache), 1)
+        self.assertIn('d', cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.info().evictions, 3)
+
+        with self.assertRaises(ValueError):
+            LruCache(capacity=-1)
+
+        cache = LruCache(capacity=0)
+        cache.put('a', 1)
+        self.assertEqual((len(cache), 'a' in cache, cache.info().evictions), (0, False, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
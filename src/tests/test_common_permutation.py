@@ -0,0 +1,46 @@
+"""test_common_permutation.py
+"""
+# Standard library imports
+import unittest
+
+# Third party imports
+
+# Local application imports
+from common.binary import BitString
+from common.permutation import compile_permutation, compile_rotation, rotate_left
+from common.str import lcs, perm
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'permutation' module
+    """
+
+    def test_compile_permutation(self):
+        permutation = [10, 1, 3, 3, 7, 2, 9, 4, 8, 6, 5]
+        compiled = compile_permutation(permutation, 10)
+        self.assertEqual((compiled.input_width, compiled.output_width), (10, 11))
+
+        for value in [0, 1, 0b1000000000, 0b1011001110, 0b1111111111]:
+            bits = format(value, '010b')
+            self.assertEqual(format(compiled(value), '011b'), perm(bits, permutation))
+            self.assertEqual(perm(bits, compiled), perm(bits, permutation))
+            self.assertEqual(str(BitString(bits).permute(compiled)), perm(bits, permutation))
+
+        self.assertIs(compile_permutation(permutation, 10), compiled)
+        with self.assertRaises(ValueError):
+            compile_permutation([0, 1], 10)
+        with self.assertRaises(ValueError):
+            BitString('0101').permute(compiled)
+
+    def test_rotation(self):
+        for shift in range(28):
+            self.assertEqual(format(rotate_left(0x9ABCDEF, shift, 28), '028b'), lcs(format(0x9ABCDEF, '028b'), shift))
+            self.assertEqual(compile_rotation(28, shift)(0x9ABCDEF), rotate_left(0x9ABCDEF, shift, 28))
+            self.assertEqual(lcs(format(0x9ABCDEF, '028b'), compile_rotation(28, shift)), lcs(format(0x9ABCDEF, '028b'), shift))
+
+
+if __name__ == '__main__':
+    unittest.main()
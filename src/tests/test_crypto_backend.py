@@ -0,0 +1,84 @@
+"""test_crypto_backend.py
+"""
+
+# Standard library imports
+import unittest
+
+# Local application imports
+from crypto import backend
+from crypto.des import dea_e, tdea_2_ede_cbc, tdea_3_ded_ecb, mac_1_e, mac_2_ede
+from common.binary import ByteString
+
+
+#
+# Test values
+#
+key8_0_to_F = ByteString('0123456789ABCDEF')
+key16 = ByteString('F19DADD9AEA429D92FB5F7B92A15FD04')
+key24 = ByteString('0123456789ABCDEFFEDCBA98765432100123456789ABCDEF')
+plaintext = ByteString('01234567899876543210012345678998')
+iv = ByteString('0011223344556677')
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'backend' module
+    """
+
+    def setUp(self):
+        self.default = backend.active_backend().name
+
+    def tearDown(self):
+        backend.select_backend(self.default)
+
+    def test_select_backend(self):
+        self.assertIn('reference', backend.available_backends())
+        self.assertIn('table', backend.available_backends())
+        self.assertNotEqual(backend.select_backend().name, 'reference')
+
+        self.assertEqual(backend.select_backend('reference').name, 'reference')
+        self.assertEqual(backend.active_backend().name, 'reference')
+
+        with self.assertRaises(ValueError):
+            backend.select_backend('rot13')
+
+    def test_backends(self):
+        for name in backend.available_backends():
+            with self.subTest(backend=name):
+                backend.select_backend(name)
+
+                self.assertEqual(backend.encrypt(key8_0_to_F, ByteString('00' * 8)), 'D5D44FF720683D0D')
+                self.assertEqual(backend.encrypt(key16, plaintext[0:8]), '7E3F0B0E968FA631')
+                self.assertEqual(backend.decrypt(key16, ByteString('7E3F0B0E968FA631')), plaintext[0:8])
+                self.assertEqual(backend.encrypt(key8_0_to_F, plaintext[0:8]),
+                                 dea_e(key8_0_to_F, plaintext[0:8]))
+
+                self.assertEqual(backend.ecb_decrypt(key24, plaintext),
+                                 tdea_3_ded_ecb(key24, plaintext))
+                self.assertEqual(backend.ecb_encrypt(key24, backend.ecb_decrypt(key24, plaintext)),
+                                 plaintext)
+
+                ciphertext = backend.cbc_encrypt(key16, plaintext, iv)
+                self.assertEqual(ciphertext, tdea_2_ede_cbc(key16, plaintext, iv))
+                self.assertEqual(backend.cbc_decrypt(key16, ciphertext, iv), plaintext)
+
+                self.assertEqual(backend.mac(key8_0_to_F, plaintext, iv),
+                                 mac_1_e(key8_0_to_F, plaintext, iv))
+                self.assertEqual(backend.mac(key16, plaintext, iv),
+                                 mac_2_ede(key16, plaintext, iv))
+
+                with self.assertRaises(ValueError):
+                    backend.encrypt(key16, plaintext)
+                with self.assertRaises(ValueError):
+                    backend.ecb_encrypt(ByteString('00' * 12), plaintext)
+                with self.assertRaises(ValueError):
+                    backend.mac(key24, plaintext)
+                for key in [key8_0_to_F, key16]:
+                    with self.assertRaisesRegex(ValueError, 'empty message'):
+                        backend.mac(key, ByteString(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
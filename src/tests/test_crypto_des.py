@@ -5,7 +5,9 @@
 import unittest
 
 # Local application imports
-from crypto.des import dea_e, dea_d, dea_ede_cbc, tdea_2_ede, tdea_2_ded, tdea_2_ede_ecb, tdea_2_ded_ecb, tdea_2_ede_cbc, tdea_2_ded_cbc, adjust_parity
+from crypto.des import dea_e, dea_d, dea_ede_cbc, tdea_2_ede, tdea_2_ded, tdea_2_ede_ecb, tdea_2_ded_ecb, tdea_2_ede_cbc, tdea_2_ded_cbc, tdea_3_ede, tdea_3_ded, adjust_parity, adjust_parity_bytes
+from crypto.des import DesEngine, get_engine, set_engine, DesKey, TdesKey, mac_1_e, mac_2_ede, Mac1, RetailMac, MacPadding, schedule_cache, encrypt_batch, decrypt_batch
+from crypto import modes
 from common.binary import HexString
 
 
@@ -115,10 +117,144 @@ class TestMethods(unittest.TestCase):
         with self.assertRaises(ValueError):
             tdea_2_ded_cbc(key16_0_to_F_to_0, zeroes16, zeroes7)
 
+    def test_engines(self):
+        default_engine = get_engine()
+        try:
+            for engine in DesEngine:
+                set_engine(engine)
+                self.assertEqual(dea_e(key8_0_to_F, zeroes8),
+                                 'D5D44FF720683D0D')
+                self.assertEqual(dea_d(key8_0_to_F, zeroes8),
+                                 '14AAD7F4DBB4E094')
+                self.assertEqual(tdea_2_ede(key16_0_to_F_to_0, zeroes8),
+                                 '08D7B4FB629D0885')
+                self.assertEqual(tdea_2_ded(key16_0_to_F_to_0, zeroes8),
+                                 'C1E6E95D2166B5C4')
+                self.assertEqual(tdea_3_ede(key16_0_to_F_to_0 + key8_0_to_F, zeroes8),
+                                 '08D7B4FB629D0885')
+                self.assertEqual(tdea_3_ded(key16_0_to_F_to_0 + key8_0_to_F, zeroes8),
+                                 'C1E6E95D2166B5C4')
+        finally:
+            set_engine(default_engine)
+
+        with self.assertRaisesRegex(ValueError, 'bogus'):
+            DesKey(key8_0_to_F).encrypt_block(bytes(8), engine='bogus')
+
+    def test_DesKey(self):
+        key = DesKey(key8_0_to_F)
+        self.assertEqual(key.encrypt_block(bytes(8)),
+                         bytes.fromhex('D5D44FF720683D0D'))
+        self.assertEqual(key.decrypt_block(bytes(8)),
+                         bytes.fromhex('14AAD7F4DBB4E094'))
+        self.assertEqual(key.encrypt_blocks(bytes(16)),
+                         bytes.fromhex('D5D44FF720683D0D' * 2))
+        self.assertEqual(key.cbc_encrypt(fortyfour16, CC8),
+                         'F31C939892FEFC8F14DBA3B2C7BAF0A7')
+        self.assertEqual(key.mac(fortyfour16),
+                         mac_1_e(key8_0_to_F, fortyfour16))
+        self.assertEqual(dea_e(key, zeroes8), 'D5D44FF720683D0D')
+        with self.assertRaises(ValueError):
+            DesKey(key4_0_to_7)
+        with self.assertRaises(ValueError):
+            key.encrypt_blocks(bytes(15))
+        with self.assertRaises(ValueError):
+            tdea_2_ede(key, zeroes8)
+
+    def test_TdesKey(self):
+        key = TdesKey(key16_0_to_F_to_0)
+        self.assertEqual(key.encrypt_block(bytes(8)),
+                         bytes.fromhex('08D7B4FB629D0885'))
+        self.assertEqual(key.decrypt_block(bytes(8)),
+                         bytes.fromhex('C1E6E95D2166B5C4'))
+        self.assertEqual(key.cbc_encrypt(zeroes16, zeroes8),
+                         '08D7B4FB629D08850A121DC33DFB5947')
+        self.assertEqual(key.cbc_decrypt(zeroes16, FF8),
+                         '3E1916A2DE994A3BC1E6E95D2166B5C4')
+        self.assertEqual(key.mac(fortyfour16),
+                         mac_2_ede(key16_0_to_F_to_0, fortyfour16))
+        self.assertEqual(TdesKey(HexString('F19DADD9AEA429D92FB5F7B92A15FD04')).ecb_decrypt(HexString('7E3F0B0E968FA631C8E4618CA317256A')),
+                         '01234567899876543210012345678998')
+        self.assertEqual(modes.cbc_encryption(tdea_2_ede, key, zeroes16.bytestring.blocks(8), zeroes8.bytestring),
+                         '08D7B4FB629D08850A121DC33DFB5947')
+        self.assertEqual(modes.ecb_encryption(tdea_2_ede, key, zeroes16.bytestring.blocks(8)),
+                         '08D7B4FB629D088508D7B4FB629D0885')
+        with self.assertRaises(ValueError):
+            TdesKey(key8_0_to_F)
+
+    def test_Mac1(self):
+        mac = Mac1(key8_0_to_F, padding=MacPadding.Method1)
+        self.assertEqual(mac.digest(), 'D5D44FF720683D0D')
+        mac.update(HexString('44' * 5))
+        prefix = mac.copy()
+        mac.update(b'\x44' * 8)
+        self.assertEqual(mac.digest(), '7C8D37BBAD7A05DE')
+        self.assertEqual(mac.digest(), '7C8D37BBAD7A05DE')
+        prefix.update(b'\x44' * 3)
+        self.assertEqual(prefix.digest(), mac_1_e(key8_0_to_F, HexString('44' * 8)))
+
+        mac = Mac1(DesKey(key8_0_to_F), padding=MacPadding.Method2)
+        for i in range(13):
+            mac.update(b'\x44')
+        self.assertEqual(mac.digest(), 'F5C6D097A9C3CCFD')
+
+        mac = Mac1(key8_0_to_F)
+        mac.update(fortyfour16)
+        self.assertEqual(mac.digest(), mac_1_e(key8_0_to_F, fortyfour16))
+        mac.update(zeroes7)
+        with self.assertRaises(ValueError):
+            mac.digest()
+        with self.assertRaises(ValueError):
+            Mac1(key8_0_to_F).digest()
+        with self.assertRaises(ValueError):
+            DesKey(key8_0_to_F).mac(HexString(''))
+
+    def test_RetailMac(self):
+        mac = RetailMac(key16_0_to_F_to_0, padding=MacPadding.Method2)
+        mac.update(HexString('44' * 13))
+        self.assertEqual(mac.digest(), '97695BB028AC510F')
+
+        mac = RetailMac(TdesKey(key16_0_to_F_to_0), padding=MacPadding.Method2)
+        mac.update(HexString('44' * 3))
+        fork = mac.copy()
+        mac.update(HexString('44' * 13))
+        self.assertEqual(mac.digest(), '13A7D8CD10309F93')
+        fork.update(HexString('44' * 10))
+        self.assertEqual(fork.digest(), '97695BB028AC510F')
+
+        mac = RetailMac(key16_0_to_F_to_0)
+        mac.update(fortyfour16)
+        self.assertEqual(mac.digest(), mac_2_ede(key16_0_to_F_to_0, fortyfour16))
+        with self.assertRaises(ValueError):
+            RetailMac(HexString('00' * 24))
+
+    def test_schedule_cache(self):
+        schedule_cache.clear()
+        schedule_cache.reset_counters()
+        tdea_2_ede(key16_0_to_F_to_0, zeroes8)
+        tdea_2_ded(key16_0_to_F_to_0_1, zeroes8)
+        self.assertEqual((schedule_cache.hits, schedule_cache.misses), (1, 1))
+        schedule_cache.clear()
+        self.assertEqual(len(schedule_cache), 0)
+
+    def test_encrypt_batch(self):
+        blocks = [bytes(8), bytes.fromhex('0123456789ABCDEF'), bytes.fromhex('FF' * 8)]
+        self.assertEqual(encrypt_batch(key16_0_to_F_to_0, blocks, lanes=2),
+                         [tdea_2_ede(key16_0_to_F_to_0, HexString(block.hex())).bytes for block in blocks])
+        self.assertEqual(encrypt_batch([key8_0_to_F, key8_0_to_F_1], blocks[0:2]),
+                         [bytes.fromhex('D5D44FF720683D0D'), dea_e(key8_0_to_F, HexString('0123456789ABCDEF')).bytes])
+        self.assertEqual(decrypt_batch(key16_0_to_F_to_0, encrypt_batch(key16_0_to_F_to_0, blocks)),
+                         blocks)
+        self.assertEqual(encrypt_batch(key8_0_to_F, []), [])
+        with self.assertRaises(ValueError):
+            encrypt_batch([key8_0_to_F], blocks)
+        with self.assertRaises(ValueError):
+            encrypt_batch([key8_0_to_F, key16_0_to_F_to_0], blocks[0:2])
+
     def test_adjust_parity(self):
         self.assertEqual(adjust_parity(key16_0_to_F_to_0), key16_0_to_F_to_0)
         self.assertEqual(adjust_parity(HexString('462EC416E0E83C04_2CD1B10731AB4736')),
                          '462FC416E0E93D042CD0B00731AB4637')
+        self.assertEqual(adjust_parity_bytes(bytes.fromhex('462EC416E0E83C04' * 3)), bytes.fromhex('462FC416E0E93D04' * 3))
 
 
 if __name__ == '__main__':
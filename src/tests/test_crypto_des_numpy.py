@@ -0,0 +1,51 @@
+"""test_crypto_des_numpy.py
+"""
+
+# Standard library imports
+import unittest
+
+# Local application imports
+from crypto import des_numpy, modes
+from crypto.des import tdea_2_ede, tdea_2_ede_ecb, tdea_3_ded_ecb
+from common.binary import ByteString
+
+
+#
+# Test values
+#
+key8_0_to_F = ByteString('0123456789ABCDEF')
+key16 = ByteString('F19DADD9AEA429D92FB5F7B92A15FD04')
+key24 = ByteString('0123456789ABCDEFFEDCBA98765432100123456789ABCDEF')
+plaintext = ByteString('01234567899876543210012345678998')
+
+
+#
+# Unit tests
+#
+@unittest.skipUnless(des_numpy.available(), "NumPy is not installed")
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'des_numpy' module
+    """
+
+    def test_ecb_encrypt(self):
+        self.assertEqual(des_numpy.ecb_encrypt(key8_0_to_F, bytes(16)),
+                         bytes.fromhex('D5D44FF720683D0D' * 2))
+        self.assertEqual(des_numpy.ecb_encrypt(key16, plaintext.bytes),
+                         bytes.fromhex('7E3F0B0E968FA631C8E4618CA317256A'))
+        with self.assertRaises(ValueError):
+            des_numpy.ecb_encrypt(key16, bytes(15))
+
+    def test_ecb_decrypt(self):
+        self.assertEqual(des_numpy.ecb_decrypt(key16, bytes.fromhex('7E3F0B0E968FA631C8E4618CA317256A')),
+                         plaintext.bytes)
+        self.assertEqual(des_numpy.ecb_decrypt(key24, plaintext.bytes),
+                         tdea_3_ded_ecb(key24, plaintext).bytes)
+
+    def test_NumpyDeaKey(self):
+        key = des_numpy.NumpyDeaKey(key16)
+        self.assertEqual(modes.ecb_encryption(tdea_2_ede, key, plaintext.blocks(8)),
+                         tdea_2_ede_ecb(key16, plaintext))
+
+
+if __name__ == '__main__':
+    unittest.main()
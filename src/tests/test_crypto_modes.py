@@ -0,0 +1,168 @@
+"""test_crypto_modes.py
+"""
+
+# Standard library imports
+import io
+import unittest
+
+# Local application imports
+from crypto import modes
+from crypto.des import TdesKey, tdea_2_ede, tdea_2_ded, tdea_2_ede_cbc, tdea_2_ded_cbc
+from common.binary import ByteString
+
+
+#
+# Test values
+#
+key16 = ByteString('F19DADD9AEA429D92FB5F7B92A15FD04')
+iv = ByteString('0011223344556677')
+plaintext = ByteString(bytes(range(256)) * 4)
+
+
+def _feed(context: modes._CipherContext, data: bytes, chunk_sizes: list[int]) -> bytes:
+    output, i, k = b'', 0, 0
+    while i < len(data):
+        size = chunk_sizes[k % len(chunk_sizes)]
+        output += context.update(memoryview(data)[i:i+size])
+        i, k = i + size, k + 1
+
+    return output + context.finalize()
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    return bytes(l ^ r for l, r in zip(left, right))
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'modes' module
+    """
+
+    def test_ecb(self):
+        blocks = list(plaintext[0:32].blocks(8))
+        ciphertext = modes.ecb_encryption(tdea_2_ede, key16, blocks)
+        self.assertEqual(ciphertext, modes.ecb_encryption(None, TdesKey(key16), blocks))
+        self.assertEqual(modes.ecb_decryption(tdea_2_ded, key16, ciphertext.blocks(8)), plaintext[0:32])
+
+    def test_cbc(self):
+        blocks = list(plaintext[0:32].blocks(8))
+        ciphertext = modes.cbc_encryption(tdea_2_ede, key16, blocks, iv)
+        self.assertEqual(ciphertext, tdea_2_ede_cbc(key16, plaintext[0:32], iv))
+        self.assertEqual(modes.cbc_decryption(tdea_2_ded, key16, ciphertext.blocks(8), iv), plaintext[0:32])
+
+    def test_EcbEncryptor(self):
+        key = TdesKey(key16)
+        expected = key.ecb_encrypt(plaintext).bytes
+
+        self.assertEqual(_feed(modes.EcbEncryptor(key), plaintext.bytes, [1, 7, 13, 64, 3]), expected)
+        self.assertEqual(_feed(modes.EcbDecryptor(key), expected, [5, 100]), plaintext.bytes)
+
+        encryptor = modes.EcbEncryptor(key)
+        self.assertEqual(encryptor.update(bytes(5)), b'')
+        with self.assertRaises(ValueError):
+            encryptor.finalize()
+        with self.assertRaises(ValueError):
+            encryptor.update(bytes(3))
+        with self.assertRaises(TypeError):
+            modes.EcbEncryptor(key16)
+        with self.assertRaises(TypeError):
+            modes._CipherContext(key)
+
+    def test_CbcEncryptor(self):
+        key = TdesKey(key16)
+        expected = tdea_2_ede_cbc(key16, plaintext, iv).bytes
+
+        self.assertEqual(_feed(modes.CbcEncryptor(key, iv), plaintext.bytes, [3, 8, 29]), expected)
+        self.assertEqual(_feed(modes.CbcDecryptor(key, iv), expected, [17, 1, 64]), plaintext.bytes)
+        self.assertEqual(modes.CbcDecryptor(key, iv.bytes).update(ByteString(expected)),
+                         tdea_2_ded_cbc(key16, ByteString(expected), iv).bytes)
+        with self.assertRaises(ValueError):
+            modes.CbcEncryptor(key, bytes(7))
+
+    def test_update_into(self):
+        key = TdesKey(key16)
+        encryptor = modes.CbcEncryptor(key, iv)
+        buffer = bytearray(32 + 7)
+
+        written = encryptor.update_into(plaintext.bytes[0:20], buffer)
+        self.assertEqual(written, 16)
+        written += encryptor.update_into(plaintext.bytes[20:32], memoryview(buffer)[16:])
+        self.assertEqual(written, 32)
+        self.assertEqual(bytes(buffer[:written]), tdea_2_ede_cbc(key16, plaintext[0:32], iv).bytes)
+
+        with self.assertRaises(ValueError):
+            encryptor.update_into(bytes(16), bytearray(16))
+
+    def test_CtrCipher(self):
+        key = TdesKey(key16)
+        counter = ByteString('FFFFFFFFFFFFFFFE')
+        keystream = key.encrypt_blocks(bytes.fromhex('FFFFFFFFFFFFFFFE' 'FFFFFFFFFFFFFFFF' '0000000000000000'))
+
+        self.assertEqual(modes.CtrCipher(key, counter).keystream_at(0, 24), keystream)
+        self.assertEqual(modes.CtrCipher(key, counter).keystream_at(5, 11), keystream[5:16])
+
+        ciphertext = _feed(modes.CtrCipher(key, counter), plaintext.bytes[0:21], [4, 9])
+        self.assertEqual(ciphertext, bytes(p ^ k for p, k in zip(plaintext.bytes[0:21], keystream)))
+        self.assertEqual(_feed(modes.CtrCipher(key, counter), ciphertext, [21]), plaintext.bytes[0:21])
+
+    def test_CtrCipher_parallel(self):
+        key = TdesKey(key16)
+        parallel_min_blocks, modes.PARALLEL_MIN_BLOCKS = modes.PARALLEL_MIN_BLOCKS, 16
+        try:
+            self.assertEqual(modes.CtrCipher(key, iv, workers=3).keystream_at(3, 1000),
+                             modes.CtrCipher(key, iv).keystream_at(3, 1000))
+
+            data = bytes(range(256)) * 4
+            cipher = modes.CtrCipher(key, iv, workers=3)
+            ciphertext = cipher.update(data[0:300]) + cipher.update(data[300:]) + cipher.finalize()
+            self.assertEqual(ciphertext, _feed(modes.CtrCipher(key, iv), data, [len(data)]))
+            with self.assertRaises(ValueError):
+                cipher.finalize()
+        finally:
+            modes.PARALLEL_MIN_BLOCKS = parallel_min_blocks
+
+    def test_parallel(self):
+        key = TdesKey(key16)
+        ciphertext = tdea_2_ede_cbc(key16, plaintext, iv).bytes
+        parallel_min_blocks, modes.PARALLEL_MIN_BLOCKS = modes.PARALLEL_MIN_BLOCKS, 16
+        try:
+            self.assertEqual(modes.parallel_cbc_decrypt(key, ciphertext, iv, workers=3), plaintext.bytes)
+            self.assertEqual(modes.parallel_ecb_encrypt(key, plaintext, workers=3), key.encrypt_blocks(plaintext.bytes))
+            self.assertEqual(modes.parallel_ecb_decrypt(key, ciphertext, workers=3), key.decrypt_blocks(ciphertext))
+            self.assertEqual(modes.parallel_cbc_decrypt(key, ciphertext[0:64], iv, workers=3), plaintext.bytes[0:64])
+        finally:
+            modes.PARALLEL_MIN_BLOCKS = parallel_min_blocks
+
+        self.assertEqual(modes.parallel_cbc_decrypt(key, b'', iv), b'')
+        self.assertEqual(modes.parallel_ecb_encrypt(key, b''), b'')
+        with self.assertRaises(ValueError):
+            modes.parallel_ecb_encrypt(key, bytes(15))
+
+    def test_OfbCipher(self):
+        key = TdesKey(key16)
+        ciphertext = _feed(modes.OfbCipher(key, iv), plaintext.bytes[0:30], [3, 11])
+
+        self.assertEqual(ciphertext[0:8], _xor(key.encrypt_block(iv.bytes), plaintext.bytes[0:8]))
+        self.assertEqual(_feed(modes.OfbCipher(key, iv), ciphertext, [30]), plaintext.bytes[0:30])
+
+    def test_CfbEncryptor(self):
+        key = TdesKey(key16)
+        ciphertext = _feed(modes.CfbEncryptor(key, iv), plaintext.bytes[0:30], [3, 11])
+
+        self.assertEqual(ciphertext[0:8], _xor(key.encrypt_block(iv.bytes), plaintext.bytes[0:8]))
+        self.assertEqual(ciphertext[8:16], _xor(key.encrypt_block(ciphertext[0:8]), plaintext.bytes[8:16]))
+        self.assertEqual(_feed(modes.CfbDecryptor(key, iv), ciphertext, [7, 30]), plaintext.bytes[0:30])
+
+    def test_crypt_stream(self):
+        key = TdesKey(key16)
+        source, destination = io.BytesIO(plaintext.bytes), io.BytesIO()
+
+        self.assertEqual(modes.crypt_stream(modes.EcbEncryptor(key), source, destination, chunk_size=100),
+                         len(plaintext))
+        self.assertEqual(destination.getvalue(), key.ecb_encrypt(plaintext).bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
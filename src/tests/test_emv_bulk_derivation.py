@@ -0,0 +1,80 @@
+"""test_emv_bulk_derivation.py
+"""
+
+# Standard library imports
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+# Local application imports
+from emv import bulk_derivation
+
+
+#
+# Test values
+#
+imk = '01234567899876543210012345678998'
+cards_csv = 'pan,psn\n5413123456784808,00\n4761739001010010,\n'
+udks_csv = 'pan,psn,udk\n5413123456784808,00,462FC416E0E93D042CD0B00731AB4637\n' \
+    '4761739001010010,,6843F7D0F8A4E07AF246623D4AA158AD\n'
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'bulk_derivation' module
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, 'cards.csv')
+        self.output = os.path.join(self.directory.name, 'udks.csv')
+        with open(self.input, 'w') as file:
+            file.write(cards_csv)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _main(self, *arguments: str) -> tuple[int, str]:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            return_code = bulk_derivation.main([*arguments, '--progress', '0'])
+
+        return return_code, stderr.getvalue()
+
+    def test_main(self):
+        return_code, report = self._main('--imk', imk, self.input, self.output)
+        self.assertEqual(return_code, 0)
+        self.assertIn('--offset 2', report)
+        with open(self.output) as file:
+            self.assertEqual(file.read(), udks_csv)
+
+    def test_main_offset(self):
+        with open(self.output, 'w') as file:
+            file.write(udks_csv.rsplit('\n', 2)[0] + '\n')
+
+        return_code, report = self._main('--imk', imk, '--offset', '1', '--workers', '2', self.input, self.output)
+        self.assertEqual(return_code, 0)
+        with open(self.output) as file:
+            self.assertEqual(file.read(), udks_csv)
+
+    def test_read_records(self):
+        self.assertEqual(list(bulk_derivation.read_records(io.StringIO('{"pan": "5413123456784808"}\n\n'), 'jsonl')),
+                         [{'pan': '5413123456784808'}])
+        with self.assertRaises(ValueError):
+            list(bulk_derivation.read_records(io.StringIO(''), 'xml'))
+
+    def test_main_without_imk(self):
+        environment = os.environ.pop(bulk_derivation.IMK_ENVIRONMENT_VARIABLE, None)
+        try:
+            self.assertEqual(self._main(self.input, self.output)[0], 2)
+        finally:
+            if environment is not None:
+                os.environ[bulk_derivation.IMK_ENVIRONMENT_VARIABLE] = environment
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""test_emv_dsc.py
+"""
+
+# Standard library imports
+import unittest
+
+# Local application imports
+from emv.dsc import generate_dcvv, generate_dcvvs, verify_dcvv
+from emv.dsc import generate_ivcvc3, cached_ivcvc3, ivcvc3_cache, generate_cvc3, generate_cvc3s, verify_cvc3
+from common.binary import ByteString
+
+
+#
+# Test values
+#
+udk = ByteString('0123456789ABCDEFFEDCBA9876543210')
+pan = '4761739001010010'
+expiration_date = '1220'
+track = F'5413123456784808D{expiration_date}0000000000000000F'
+un = '12345678'
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'dsc' module
+    """
+
+    def test_generate_dcvvs(self):
+        self.assertEqual(generate_dcvvs(udk, pan, range(1, 33), expiration_date),
+                         [generate_dcvv(udk, pan, F"{atc:04X}", expiration_date) for atc in range(1, 33)])
+        self.assertEqual(generate_dcvvs(udk, pan[:-1], ['0001', 2], expiration_date, service_code='101'),
+                         ['337', '993'])
+        self.assertEqual(generate_dcvvs(udk, pan, [], expiration_date), [])
+        with self.assertRaises(ValueError):
+            generate_dcvvs(udk, pan, [1, 0x10000], expiration_date)
+        with self.assertRaises(ValueError):
+            generate_dcvvs(udk, pan, ['0001', '001'], expiration_date)
+        with self.assertRaises(ValueError):
+            generate_dcvvs(udk, pan, [-1], expiration_date)
+
+    def test_verify_dcvv(self):
+        dcvv = generate_dcvv(udk, pan, '0015', expiration_date)
+        self.assertIn(0x15, verify_dcvv(udk, pan, dcvv, range(1, 33), expiration_date))
+        self.assertEqual(verify_dcvv(udk, pan, dcvv, range(0x100, 0x100), expiration_date), [])
+
+    def test_cached_ivcvc3(self):
+        ivcvc3_cache.clear()
+        ivcvc3_cache.reset_counters()
+
+        self.assertEqual(cached_ivcvc3(udk, track), generate_ivcvc3(udk, track))
+        self.assertEqual(cached_ivcvc3(udk, track), 'C834')
+        info = ivcvc3_cache.info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 1, 1))
+        self.assertEqual(len(ivcvc3_cache), 1)
+        self.assertNotIn((udk.bytes, track), ivcvc3_cache)
+
+    def test_generate_cvc3s(self):
+        self.assertEqual(generate_cvc3s(udk, 'C834', [(un, atc) for atc in range(1, 10)]),
+                         [generate_cvc3(udk, F"C834{un}{atc:04X}") for atc in range(1, 10)])
+        self.assertEqual(generate_cvc3s(udk, 'C834', [(un, '0001')]), ['18231'])
+        self.assertEqual(generate_cvc3s(udk, 'C834', []), [])
+        with self.assertRaises(ValueError):
+            generate_cvc3s(udk, 'C834', [(un, '00001')])
+
+    def test_verify_cvc3(self):
+        self.assertEqual(verify_cvc3(udk, track, un, '57168', range(1, 10)), [5])
+        self.assertEqual(verify_cvc3(udk, track, un, '168', range(1, 10)), [5])
+        self.assertEqual(verify_cvc3(udk, track, un, '57168', range(6, 10)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
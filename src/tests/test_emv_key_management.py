@@ -0,0 +1,40 @@
+"""test_emv_key_management.py
+"""
+
+# Standard library imports
+import unittest
+
+# Local application imports
+from emv.key_management import master_key_derivation_A, derive_udks
+from common.binary import ByteString
+
+
+#
+# Test values
+#
+imk = ByteString('01234567899876543210012345678998')
+records = [('5413123456784808', '00'), ('4761739001010010', '00'), ('476173900101', '01')]
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    """Unit tests for 'key_management' module
+    """
+
+    def test_master_key_derivation_A(self):
+        self.assertEqual(master_key_derivation_A(imk, '5413123456784808', '00'),
+                         '462FC416E0E93D042CD0B00731AB4637')
+
+    def test_derive_udks(self):
+        expected = [master_key_derivation_A(imk, pan, psn).bytes for pan, psn in records]
+
+        self.assertEqual(list(derive_udks(imk, records)), expected)
+        self.assertEqual(list(derive_udks(imk, iter(records), batch_size=2)), expected)
+        self.assertEqual(list(derive_udks(imk, records, workers=2, batch_size=1)), expected)
+        self.assertEqual(list(derive_udks(imk, [])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
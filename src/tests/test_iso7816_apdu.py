@@ -0,0 +1,29 @@
+"""test_iso7816_apdu.py
+"""
+# Standard library imports
+import unittest
+
+# Third party imports
+
+# Local application imports
+from common.binary import interned
+from iso7816.apdu import RAPDU, ResponseProcessingState, StatusBytes
+
+
+#
+# Unit tests
+#
+class TestMethods(unittest.TestCase):
+    def test_SW12(self):
+        self.assertIs(RAPDU('9000').SW12, RAPDU('9F3602001F9000').SW12)
+        self.assertIsInstance(RAPDU('9000').SW12, StatusBytes)
+        self.assertEqual(RAPDU('9000').SW12, interned('9000'))
+        self.assertEqual(RAPDU('9000').SW12.state, ResponseProcessingState.Normal)
+        self.assertIs(RAPDU('6A82').SW1, interned('6A'))
+
+        self.assertEqual(RAPDU('6A99').SW12, '6A99')
+        self.assertIsNot(RAPDU('6A99').SW12, RAPDU('6A99').SW12)
+
+
+if __name__ == '__main__':
+    unittest.main()